@@ -0,0 +1,97 @@
+"""
+Parsing of the sports-reference season exports. Kept free of the app and
+database imports: import_games_from_excel runs parse_file in a process
+pool, and every worker imports this module.
+"""
+import pandas as pd
+
+DATE_FORMATS = ("%a, %b %d, %Y", "%Y-%m-%d")
+
+TEAM_ABBR = {
+    "Atlanta Hawks": "ATL",
+    "Boston Celtics": "BOS",
+    "Brooklyn Nets": "BKN",
+    "Charlotte Hornets": "CHA",
+    "Chicago Bulls": "CHI",
+    "Cleveland Cavaliers": "CLE",
+    "Dallas Mavericks": "DAL",
+    "Denver Nuggets": "DEN",
+    "Detroit Pistons": "DET",
+    "Golden State Warriors": "GSW",
+    "Houston Rockets": "HOU",
+    "Indiana Pacers": "IND",
+    "Los Angeles Clippers": "LAC",
+    "Los Angeles Lakers": "LAL",
+    "Memphis Grizzlies": "MEM",
+    "Miami Heat": "MIA",
+    "Milwaukee Bucks": "MIL",
+    "Minnesota Timberwolves": "MIN",
+    "New Orleans Pelicans": "NOP",
+    "New York Knicks": "NYK",
+    "Oklahoma City Thunder": "OKC",
+    "Orlando Magic": "ORL",
+    "Philadelphia 76ers": "PHI",
+    "Phoenix Suns": "PHX",
+    "Portland Trail Blazers": "POR",
+    "Sacramento Kings": "SAC",
+    "San Antonio Spurs": "SAS",
+    "Toronto Raptors": "TOR",
+    "Utah Jazz": "UTA",
+    "Washington Wizards": "WAS",
+}
+
+def read_export(filepath):
+    """
+    Reads a sports-reference export. Their .xls downloads are really HTML
+    tables, so the file is sniffed instead of trying read_excel first.
+    """
+    with open(filepath, "rb") as f:
+        is_html = f.read(512).lstrip().startswith(b"<")
+    if is_html:
+        return pd.read_html(filepath)[0]
+    return pd.read_excel(filepath)
+
+def parse_dates(values):
+    values = values.astype(str).str.strip()
+    dates = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        dates = dates.fillna(pd.to_datetime(values, format=fmt, errors="coerce"))
+    return dates
+
+def normalize_games(df):
+    """
+    Turns an export into Game columns with vectorized ops. Rows with an
+    unknown date format, team or score are dropped; returns (games, dropped).
+    """
+    df = df[
+        ["Date", "Visitor/Neutral", "PTS", "Home/Neutral", "PTS.1"]
+    ].rename(
+        columns={
+            "Visitor/Neutral": "Visitor",
+            "PTS": "VisitorPts",
+            "Home/Neutral": "Home",
+            "PTS.1": "HomePts",
+        }
+    )
+
+    games = pd.DataFrame({
+        "date": parse_dates(df["Date"]),
+        "home_team": df["Home"].astype(str).str.strip().map(TEAM_ABBR),
+        "visitor_team": df["Visitor"].astype(str).str.strip().map(TEAM_ABBR),
+        "home_score": pd.to_numeric(df["HomePts"], errors="coerce"),
+        "visitor_score": pd.to_numeric(df["VisitorPts"], errors="coerce"),
+    })
+    valid = games.notna().all(axis=1)
+    games = games[valid].astype({"home_score": int, "visitor_score": int})
+
+    games["game_id"] = (
+        games["date"].dt.strftime("%Y-%m-%d") + "_" + games["home_team"] + "_" + games["visitor_team"]
+        + "_" + games["home_score"].astype(str) + "_" + games["visitor_score"].astype(str)
+    )
+    games["date"] = games["date"].dt.date
+    return games.reset_index(drop=True), int((~valid).sum())
+
+def parse_file(filepath):
+    """Worker side of the pipeline: read and normalize one export."""
+    games, dropped = normalize_games(read_export(filepath))
+    return filepath, games, dropped
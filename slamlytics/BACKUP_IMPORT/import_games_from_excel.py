@@ -1,132 +1,99 @@
 import os
+import time
 import pandas as pd
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import select
 from app.models import Game, db
-
-try:
-    from app import app
-except ImportError:
-    from app import create_app
-    app = create_app()
+from app.metrics import stage
+from game_archive import mark_games_changed, update_archive
+from import_games import insert_games
+from ml_models import update_ratings
+from model_registry import refresh_models
+from prediction_results import settle_predictions
+from excel_exports import parse_file
 
 EXCEL_DIR = "GAMES_24_25"
-
-TEAM_ABBR = {
-    "Atlanta Hawks": "ATL",
-    "Boston Celtics": "BOS",
-    "Brooklyn Nets": "BKN",
-    "Charlotte Hornets": "CHA",
-    "Chicago Bulls": "CHI",
-    "Cleveland Cavaliers": "CLE",
-    "Dallas Mavericks": "DAL",
-    "Denver Nuggets": "DEN",
-    "Detroit Pistons": "DET",
-    "Golden State Warriors": "GSW",
-    "Houston Rockets": "HOU",
-    "Indiana Pacers": "IND",
-    "Los Angeles Clippers": "LAC",
-    "Los Angeles Lakers": "LAL",
-    "Memphis Grizzlies": "MEM",
-    "Miami Heat": "MIA",
-    "Milwaukee Bucks": "MIL",
-    "Minnesota Timberwolves": "MIN",
-    "New Orleans Pelicans": "NOP",
-    "New York Knicks": "NYK",
-    "Oklahoma City Thunder": "OKC",
-    "Orlando Magic": "ORL",
-    "Philadelphia 76ers": "PHI",
-    "Phoenix Suns": "PHX",
-    "Portland Trail Blazers": "POR",
-    "Sacramento Kings": "SAC",
-    "San Antonio Spurs": "SAS",
-    "Toronto Raptors": "TOR",
-    "Utah Jazz": "UTA",
-    "Washington Wizards": "WAS",
-}
-
-def parse_date(date_str: str):
-    date_str = str(date_str).strip()
-    for fmt in ("%Y-%m-%d", "%a, %b %d, %Y"):
+SYNC_SOURCE = "excel"
+KEY_COLUMNS = ["date", "home_team", "visitor_team", "home_score", "visitor_score"]
+
+def _existing_keys(frames):
+    dates = [d for games in frames for d in (games["date"].min(), games["date"].max()) if not games.empty]
+    if not dates:
+        return set()
+    columns = [getattr(Game, name) for name in KEY_COLUMNS]
+    return set(map(tuple, db.session.execute(select(*columns).where(Game.date.between(min(dates), max(dates))))))
+
+def import_games_from_excel(excel_dir=EXCEL_DIR, workers=None):
+    """
+    Parses the exports in excel_dir in a process pool, dedupes them against
+    the stored games on (date, teams, scores) and bulk inserts each file in
+    its own transaction, oldest file first so the Elo ratings can be
+    updated incrementally. Returns the number of games added.
+    """
+    start = time.perf_counter()
+    files = [
+        os.path.join(excel_dir, file) for file in sorted(os.listdir(excel_dir))
+        if file.endswith((".xls", ".xlsx"))
+    ]
+
+    parsed = []
+    with stage('import_excel.parse'), ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {file: pool.submit(parse_file, file) for file in files}
+        for file, future in futures.items():
+            try:
+                parsed.append(future.result())
+            except Exception as e:
+                print(f"Error with processing {file}: {e}")
+    parsed.sort(key=lambda item: (item[1]["date"].min() if not item[1].empty else pd.Timestamp.max.date()))
+
+    existing = _existing_keys([games for _, games, _ in parsed])
+    total_rows = added = 0
+    for filepath, games, dropped in parsed:
+        file = os.path.basename(filepath)
+        total_rows += len(games) + dropped
+
+        keys = pd.MultiIndex.from_frame(games[KEY_COLUMNS])
+        fresh = games[~keys.isin(existing) & ~keys.duplicated()]
         try:
-            return datetime.strptime(date_str, fmt).date()
-        except ValueError:
+            with stage('import_excel.insert'):
+                new_games = insert_games(fresh.to_dict("records"))
+                if new_games:
+                    mark_games_changed(SYNC_SOURCE)
+            with stage('import_excel.ratings'):
+                update_ratings(new_games)
+            with stage('import_excel.commit'):
+                db.session.commit()
+            with stage('import_excel.settle'):
+                settle_predictions((g.home_team, g.visitor_team) for g in new_games)
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error with processing {file}: {e}")
             continue
-    raise ValueError(f"Unknown date format: {date_str}")
 
-def to_abbr(team_name: str) -> str:
-    team_name = str(team_name).strip()
-    if team_name not in TEAM_ABBR:
-        raise ValueError(f"Unknown command: {team_name}")
-    return TEAM_ABBR[team_name]
+        existing.update(keys)
+        added += len(new_games)
+        print(f"File {file}: {len(games)} games, {len(new_games)} new, {len(games) - len(fresh)} already in the DB, {dropped} unparseable rows.")
 
-def import_games_from_excel():
-    added = 0
-    for file in os.listdir(EXCEL_DIR):
-        if not file.endswith((".xls", ".xlsx")):
-            continue
-        filepath = os.path.join(EXCEL_DIR, file)
+    elapsed = time.perf_counter() - start
+    print(f"Import is done. Total added {added} games from {total_rows} rows "
+          f"in {elapsed:.2f}s ({total_rows / elapsed if elapsed else 0:.0f} rows/s).")
 
+    if added:
+        refresh_models()
         try:
-            try:
-                df = pd.read_excel(filepath)
-            except Exception:
-                df = pd.read_html(filepath)[0]
-
-            df = df[
-                ["Date", "Visitor/Neutral", "PTS", "Home/Neutral", "PTS.1"]
-            ].rename(
-                columns={
-                    "Visitor/Neutral": "Visitor",
-                    "PTS": "VisitorPts",
-                    "Home/Neutral": "Home",
-                    "PTS.1": "HomePts",
-                }
-            )
-
-            for _, row in df.iterrows():
-                try:
-                    game_date = parse_date(row["Date"])
-                    home_team = to_abbr(row["Home"])
-                    visitor_team = to_abbr(row["Visitor"])
-                    home_score = int(row["HomePts"])
-                    visitor_score = int(row["VisitorPts"])
-
-                    existing_game = Game.query.filter_by(
-                        date=game_date,
-                        home_team=home_team,
-                        visitor_team=visitor_team,
-                        home_score=home_score,
-                        visitor_score=visitor_score
-                    ).first()
-
-                    if existing_game:
-                        print(f"Skip the game {visitor_team} @ {home_team} {visitor_score}-{home_score} ({game_date}) — already in the DB")
-                        continue
-
-                    game_id = f"{game_date}_{home_team}_{visitor_team}_{home_score}_{visitor_score}"
-
-                    print(f"Adding game {visitor_team} @ {home_team} {visitor_score}-{home_score} ({game_date})")
-
-                    game = Game(
-                        game_id=game_id,
-                        home_team=home_team,
-                        visitor_team=visitor_team,
-                        home_score=home_score,
-                        visitor_score=visitor_score,
-                        date=game_date,
-                    )
-                    db.session.add(game)
-                    added += 1
-                except Exception as e:
-                    print(f"Error in line {file}: {e}")
-
-            db.session.commit()
-            print(f"File {file} is processed.")
+            with stage('import_excel.archive'):
+                update_archive()
         except Exception as e:
-            print(f"Error with processing {file}: {e}")
-
-    print(f"Import is done. Total added {added} games.")
+            print(f"Error updating the game archive: {e}")
+    return added
 
 if __name__ == "__main__":
+    try:
+        from app import app
+    except ImportError:
+        from app import create_app
+        app = create_app()
+
     with app.app_context():
         import_games_from_excel()
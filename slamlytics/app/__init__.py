@@ -9,7 +9,7 @@ login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
 migrate = Migrate()
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     
     app.config['SECRET_KEY'] = 'your_secret_key_here'
@@ -17,6 +17,17 @@ def create_app():
     base_dir = os.path.abspath(os.path.dirname(__file__))
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(base_dir, 'instance', 'site.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['MODEL_DIR'] = os.path.join(base_dir, 'instance', 'models')
+    app.config['GAME_ARCHIVE_DIR'] = os.path.join(base_dir, 'instance', 'archive')
+    app.config['MODEL_WEIGHTING'] = 'team_rank'
+    app.config['SYNC_INTERVAL_MINUTES'] = int(os.getenv('SYNC_INTERVAL_MINUTES', 0))
+    app.config['SYNC_LOCK_FILE'] = os.path.join(base_dir, 'instance', 'sync.lock')
+    # Set by gunicorn.conf.py: threads don't survive fork(), so background
+    # jobs are started in each worker by its post_fork hook instead.
+    app.config['PREFORK'] = os.getenv('SLAMLYTICS_PREFORK') == '1'
+
+    if config:
+        app.config.update(config)
 
     os.makedirs(os.path.join(base_dir, 'instance'), exist_ok=True)
 
@@ -24,11 +35,24 @@ def create_app():
     login_manager.init_app(app)
     migrate.init_app(app, db)
 
-    from .routes import auth, main, admin, games
+    from . import metrics, commands
+    metrics.init_app(app)
+    commands.init_app(app)
+
+    from .routes import auth, main, admin, games, api
 
     app.register_blueprint(auth.auth)
     app.register_blueprint(main.main_bp)
     app.register_blueprint(admin.admin)
     app.register_blueprint(games.games_bp)
+    app.register_blueprint(api.api_bp)
+
+    if not app.config['PREFORK']:
+        start_background_jobs(app)
 
     return app
+
+def start_background_jobs(app):
+    if app.config['SYNC_INTERVAL_MINUTES']:
+        from sync_jobs import start_scheduler
+        start_scheduler(app, app.config['SYNC_INTERVAL_MINUTES'])
@@ -0,0 +1,32 @@
+import click
+from flask.cli import with_appcontext
+
+from . import db
+
+
+@click.command('settle-predictions')
+@with_appcontext
+def settle_predictions_command():
+    """Settle every pending prediction whose game is already imported."""
+    from prediction_results import settle_predictions
+
+    settled = settle_predictions()
+    db.session.commit()
+    click.echo(f"Settled {settled} predictions.")
+
+
+@click.command('sync-games')
+@with_appcontext
+def sync_games_command():
+    """Fetch the games played since the last sync (for cron)."""
+    from import_games import sync_games
+
+    added = sync_games()
+    if added is None:
+        raise click.ClickException("Sync failed.")
+    click.echo(f"Added {added} new games.")
+
+
+def init_app(app):
+    app.cli.add_command(settle_predictions_command)
+    app.cli.add_command(sync_games_command)
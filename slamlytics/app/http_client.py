@@ -0,0 +1,151 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when upstream fails and there is no earlier payload to serve."""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures; while open, calls
+    are refused until reset_timeout has passed, then one trial call is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class CachedJSONClient:
+    """
+    GETs JSON over a keep-alive session with strict timeouts and caches
+    each response per (url, params):
+
+    - younger than ttl: served from the cache;
+    - younger than stale_ttl: served from the cache while one background
+      request refreshes it (stale-while-revalidate);
+    - older or missing: fetched inline.
+
+    Failed fetches trip the circuit breaker; whenever upstream fails or
+    the circuit is open the last good payload is served, however old.
+    """
+
+    def __init__(self, ttl=30, stale_ttl=300, timeout=(3.05, 5), pool_size=10,
+                 failure_threshold=3, reset_timeout=30):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._cache = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='http-refresh')
+        return self._executor
+
+    def _fetch(self, key, url, params, headers):
+        if not self.breaker.allow():
+            raise UpstreamUnavailable(f"Circuit open for {url}")
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self.breaker.record_failure()
+            raise UpstreamUnavailable(str(e)) from e
+
+        self.breaker.record_success()
+        with self._lock:
+            self._cache[key] = (time.monotonic(), payload)
+        return payload
+
+    def _refresh(self, key, url, params, headers):
+        try:
+            self._fetch(key, url, params, headers)
+        except UpstreamUnavailable as e:
+            print("Background refresh failed:", e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_json(self, url, params=None, headers=None):
+        key = (url, tuple(sorted((params or {}).items())))
+        with self._lock:
+            cached = self._cache.get(key)
+        age = time.monotonic() - cached[0] if cached else None
+
+        if cached and age < self.ttl:
+            return cached[1]
+
+        if cached and age < self.stale_ttl:
+            with self._lock:
+                start_refresh = key not in self._refreshing
+                self._refreshing.add(key)
+            if start_refresh:
+                self._get_executor().submit(self._refresh, key, url, params, headers)
+            return cached[1]
+
+        try:
+            return self._fetch(key, url, params, headers)
+        except UpstreamUnavailable:
+            if cached:
+                return cached[1]
+            raise
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,112 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from flask import g, request, template_rendered, before_render_template
+
+BUFFER_SIZE = 1000
+QUANTILES = (0.5, 0.95, 0.99)
+
+_lock = threading.Lock()
+_samples = {}
+_totals = {}
+
+
+def record(name, seconds):
+    """Adds one duration to the named series' ring buffer and running totals."""
+    with _lock:
+        buffer = _samples.get(name)
+        if buffer is None:
+            buffer = _samples[name] = deque(maxlen=BUFFER_SIZE)
+            _totals[name] = [0, 0.0]
+        buffer.append(seconds)
+        _totals[name][0] += 1
+        _totals[name][1] += seconds
+
+
+@contextmanager
+def stage(name):
+    """Times the enclosed block as a named stage, e.g. stage('train_models.fit_rf')."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def _quantile(sorted_values, q):
+    index = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def snapshot():
+    """Per-series count, total and p50/p95/p99/max over the buffered samples."""
+    with _lock:
+        series = {name: (sorted(buffer), list(_totals[name])) for name, buffer in _samples.items()}
+
+    rows = []
+    for name, (values, (count, total)) in sorted(series.items()):
+        row = {'name': name, 'count': count, 'total': total, 'max': values[-1]}
+        for q in QUANTILES:
+            row[f'p{int(q * 100)}'] = _quantile(values, q)
+        rows.append(row)
+    return rows
+
+
+def prometheus_text():
+    """The snapshot in Prometheus text exposition format, as summaries."""
+    lines = [
+        '# HELP slamlytics_duration_seconds Request and stage durations.',
+        '# TYPE slamlytics_duration_seconds summary',
+    ]
+    for row in snapshot():
+        name = row['name'].replace('\\', '\\\\').replace('"', '\\"')
+        for q in QUANTILES:
+            lines.append(f'slamlytics_duration_seconds{{name="{name}",quantile="{q}"}} {row[f"p{int(q * 100)}"]:.6f}')
+        lines.append(f'slamlytics_duration_seconds_sum{{name="{name}"}} {row["total"]:.6f}')
+        lines.append(f'slamlytics_duration_seconds_count{{name="{name}"}} {row["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+
+
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+def _stop_request_timer(response):
+    started = g.pop('request_started', None)
+    if started is not None and request.endpoint != 'static':
+        # Requests no route matched (404s, 405s) have no endpoint; they share
+        # one series rather than one per probed URL.
+        endpoint = request.endpoint or 'unmatched'
+        record(f'request.{endpoint}', time.perf_counter() - started)
+    return response
+
+
+def _start_render_timer(sender, template, context, **extra):
+    g.setdefault('render_started', []).append(time.perf_counter())
+
+
+def _stop_render_timer(sender, template, context, **extra):
+    started = g.get('render_started')
+    if started:
+        record(f'render.{template.name}', time.perf_counter() - started.pop())
+
+
+def init_app(app):
+    """
+    Times every request (named by endpoint, so per blueprint and view, or
+    request.unmatched when no route matched) and every template render of
+    the app.
+    """
+    app.before_request(_start_request_timer)
+    app.after_request(_stop_request_timer)
+    before_render_template.connect(_start_render_timer, app)
+    template_rendered.connect(_stop_render_timer, app)
@@ -20,19 +20,56 @@ class Game(db.Model):
     visitor_team = db.Column(db.String(50))
     home_score = db.Column(db.Integer)
     visitor_score = db.Column(db.Integer)
-    date = db.Column(db.Date)
+    date = db.Column(db.Date, index=True)
+
+    __table_args__ = (
+        db.Index('ix_game_matchup', 'home_team', 'visitor_team', 'date', 'home_score', 'visitor_score'),
+    )
+
+class TeamRating(db.Model):
+    team = db.Column(db.String(50), primary_key=True)
+    rating = db.Column(db.Float, nullable=False)
+    games = db.Column(db.Integer, nullable=False, default=0)
+    last_game_date = db.Column(db.Date)
+
+class SyncState(db.Model):
+    source = db.Column(db.String(50), primary_key=True)
+    last_game_date = db.Column(db.Date)
+    last_game_id = db.Column(db.String)
+    last_synced_at = db.Column(db.DateTime)
+    # Replaced whenever this source writes games; see game_archive.data_version.
+    data_version = db.Column(db.String(32))
+
+class ModelStat(db.Model):
+    model = db.Column(db.String(10), primary_key=True)
+    tp = db.Column(db.Integer, nullable=False, default=0)
+    fp = db.Column(db.Integer, nullable=False, default=0)
+    score = db.Column(db.Integer, nullable=False, default=0)
 
 class Prediction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
 
     home_team = db.Column(db.String(50), nullable=False)
     visitor_team = db.Column(db.String(50), nullable=False)
 
     lr_prob_team1_win = db.Column(db.Float)
     rf_prob_team1_win = db.Column(db.Float)
+    hgb_prob_team1_win = db.Column(db.Float)
+    elo_prob_team1_win = db.Column(db.Float)
 
     created_at = db.Column(db.DateTime, default=db.func.now())
 
+    resolved_game_id = db.Column(db.Integer, db.ForeignKey('game.id'), index=True)
+    actual_winner = db.Column(db.String(50))
+    lr_hit = db.Column(db.Boolean)
+    rf_hit = db.Column(db.Boolean)
+    hgb_hit = db.Column(db.Boolean)
+    elo_hit = db.Column(db.Boolean)
+    lr_log_loss = db.Column(db.Float)
+    rf_log_loss = db.Column(db.Float)
+    hgb_log_loss = db.Column(db.Float)
+    elo_log_loss = db.Column(db.Float)
+
     user = db.relationship("User", backref="predictions")
 
@@ -1,7 +1,8 @@
 import re
-from flask import Blueprint, render_template, abort, request, redirect, url_for, flash
+from flask import Blueprint, render_template, abort, request, redirect, url_for, flash, current_app, Response
 from flask_login import current_user, login_required
 from ..models import User, db
+from .. import metrics
 from werkzeug.security import generate_password_hash
 
 admin = Blueprint('admin', __name__, url_prefix='/admin')
@@ -40,6 +41,30 @@ def dashboard():
     return render_template('admin_dashboard.html', users=users)
 
 
+# ===============================
+# METRICS
+# ===============================
+@admin.route('/metrics')
+@login_required
+@admin_required
+def metrics_dashboard():
+    return render_template('admin_metrics.html', rows=metrics.snapshot(), buffer_size=metrics.BUFFER_SIZE)
+
+
+@admin.route('/metrics/prometheus')
+def metrics_prometheus():
+    """
+    Prometheus text format. Admins can open it in the browser; a scraper
+    authenticates with "Authorization: Bearer <METRICS_TOKEN>" if that
+    config value is set.
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if not (token and request.headers.get('Authorization') == f"Bearer {token}"):
+        if not current_user.is_authenticated or not current_user.is_admin:
+            abort(403)
+    return Response(metrics.prometheus_text(), mimetype='text/plain; version=0.0.4')
+
+
 # ===============================
 # EDIT USER
 # ===============================
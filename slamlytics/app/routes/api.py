@@ -0,0 +1,66 @@
+from flask import Blueprint, jsonify, request
+from flask_login import login_required
+from app import db
+from app.models import TeamRating
+
+api_bp = Blueprint('api', __name__, url_prefix='/api')
+
+MAX_BATCH_SIZE = 5000
+
+def _parse_pair(item):
+    if isinstance(item, dict):
+        return item.get('home_team'), item.get('visitor_team')
+    if isinstance(item, (list, tuple)) and len(item) == 2:
+        return item[0], item[1]
+    return None, None
+
+@api_bp.route('/predictions/batch', methods=['POST'])
+@login_required
+def predictions_batch():
+    """
+    Body: {"pairs": [["BOS", "LAL"], {"home_team": "DEN", "visitor_team": "MIA"}, ...]}
+    Every pair is scored with a single predict_proba call per model, as of
+    the same day as the precomputed matrices /create-prediction reads.
+    """
+    from ml_models import predict_matches, elo_probability
+    from model_registry import get_models
+
+    payload = request.get_json(silent=True) or {}
+    items = payload.get('pairs')
+
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': "Expected a non-empty 'pairs' list."}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({'error': f"At most {MAX_BATCH_SIZE} pairs per request."}), 400
+
+    pairs = [_parse_pair(item) for item in items]
+    for i, (home_team, visitor_team) in enumerate(pairs):
+        if not isinstance(home_team, str) or not isinstance(visitor_team, str):
+            return jsonify({'error': f"Pair {i} must be [home_team, visitor_team]."}), 400
+
+    models = get_models()
+    if models['lr'] is None:
+        return jsonify({'error': models['results'].get('error', 'No trained model.')}), 503
+
+    known = models['team_index']
+    probs = predict_matches(
+        pairs, models['lr'], models['rf'], teams=models['teams'], form=models['form'], as_of=models['as_of'],
+        hgb_model=models['hgb'],
+    )
+    ratings = dict(db.session.query(TeamRating.team, TeamRating.rating).all())
+
+    predictions = []
+    for (home_team, visitor_team), prob in zip(pairs, probs):
+        entry = {'home_team': home_team, 'visitor_team': visitor_team}
+        if home_team not in known or visitor_team not in known or home_team == visitor_team:
+            entry.update({key: None for key in prob})
+            entry['error'] = 'Unknown team or same team on both sides.'
+        else:
+            entry.update(prob)
+        if home_team in ratings and visitor_team in ratings and home_team != visitor_team:
+            entry['elo_prob_team1_win'] = float(elo_probability(ratings[home_team], ratings[visitor_team]))
+        else:
+            entry['elo_prob_team1_win'] = None
+        predictions.append(entry)
+
+    return jsonify({'fingerprint': models['fingerprint'], 'predictions': predictions})
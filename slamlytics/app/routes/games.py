@@ -1,24 +1,22 @@
-from flask import Blueprint, render_template
-import requests
+from flask import Blueprint, current_app, render_template
+from ..http_client import CachedJSONClient, UpstreamUnavailable
 
 games_bp = Blueprint('games', __name__, url_prefix='/games')
 
 API_URL = "https://www.balldontlie.io/api/v1/games"
 
+# Shared by every request of the process, so connections and cached pages are reused.
+client = CachedJSONClient()
+
 @games_bp.route('/')
 def games_list():
     games_data = []
 
     try:
         params = {"per_page": 30, "page": 1}
-        response = requests.get(API_URL, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            games_data = data.get('data', [])
-            print(f"DEBUG: Fetched {len(games_data)} games")
-        else:
-            print("Error: Status code", response.status_code)
-    except Exception as e:
+        data = client.get_json(current_app.config.get('LIVE_GAMES_URL', API_URL), params=params)
+        games_data = data.get('data', [])
+    except UpstreamUnavailable as e:
         print("Error fetching games:", e)
 
     return render_template('games.html', games=games_data)
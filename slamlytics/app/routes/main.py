@@ -1,9 +1,11 @@
-from flask import Blueprint, render_template, redirect, url_for, request
+from flask import Blueprint, render_template, redirect, url_for, request, jsonify
 from flask_login import login_required, current_user
-from app.models import Game, Prediction
+from app.models import Game, Prediction, SyncState
 from app import db
-from import_games import import_last_30_games
-from ml_models import train_models, predict_match
+from import_games import SYNC_SOURCE
+from prediction_results import model_stats, settle_predictions, unsettle_prediction, user_leaderboard
+from training_jobs import is_training, job_status
+from sync_jobs import is_syncing, submit_sync, sync_status
 
 main_bp = Blueprint('main', __name__)
 
@@ -30,31 +32,63 @@ def games():
     return render_template(
         "games.html",
         games=last_games,
-        pagination=pagination
+        pagination=pagination,
+        sync_state=db.session.get(SyncState, SYNC_SOURCE),
+        syncing=is_syncing()
     )
 
 @main_bp.route('/import-games')
 @login_required
 def import_games_route():
-    import_last_30_games()
+    submit_sync()
     return redirect(url_for('main.games'))
 
+@main_bp.route('/import-games/status')
+@login_required
+def import_games_status():
+    state = db.session.get(SyncState, SYNC_SOURCE)
+
+    return jsonify({
+        'syncing': is_syncing(),
+        'job': sync_status(),
+        'last_game_date': state.last_game_date.isoformat() if state and state.last_game_date else None,
+        'last_synced_at': state.last_synced_at.isoformat(timespec='seconds') if state and state.last_synced_at else None,
+    })
+
 @main_bp.route('/model')
 @login_required
 def model():
-    results, lr_model, rf_model = train_models(return_models=True)
+    from model_registry import get_models
 
-    try:
-        import pickle
-        with open('models/lr_model.pkl', 'wb') as f:
-            pickle.dump(lr_model, f)
-        with open('models/rf_model.pkl', 'wb') as f:
-            pickle.dump(rf_model, f)
-    except Exception:
-        pass
+    models = get_models()
+    results = models['results']
 
+    return render_template(
+        'model.html',
+        lr_summary=results,
+        rf_summary=results,
+        hgb_summary=results,
+        trained_at=models.get('trained_at'),
+        training=is_training()
+    )
 
-    return render_template('model.html', lr_summary=results, rf_summary=results)
+@main_bp.route('/model/status')
+@login_required
+def model_status():
+    from model_registry import get_models, current_fingerprint
+
+    models = get_models()
+    fingerprint = current_fingerprint()
+
+    return jsonify({
+        'data_fingerprint': fingerprint,
+        'model_fingerprint': models['fingerprint'],
+        'up_to_date': models['fingerprint'] == fingerprint,
+        'trained_at': models.get('trained_at'),
+        'train_seconds': models.get('train_seconds'),
+        'metrics': models['results'],
+        'job': job_status(),
+    })
 
 @main_bp.route('/my-predictions')
 @login_required
@@ -79,6 +113,9 @@ def create_prediction():
     }
 
     if request.method == 'POST':
+        from ml_models import elo_match_probability
+        from model_registry import match_probabilities
+
         home_team = request.form.get('home_team')
         visitor_team = request.form.get('visitor_team')
 
@@ -87,20 +124,36 @@ def create_prediction():
             flash("Home team and visitor team cannot be the same!", "error")
             return render_template('create_prediction.html', teams=teams)
 
-        results, lr_model, rf_model = train_models(return_models=True)
-
-        probs = predict_match(home_team, visitor_team, lr_model, rf_model)
+        # Read before match_probabilities, which queues a retry of a failed run.
+        last_job = job_status()
+        probs = match_probabilities(home_team, visitor_team)
+        if not probs:
+            from flask import flash
+            from model_registry import get_models
+            if last_job['state'] == 'failed':
+                flash(f"Model training failed: {last_job['error']}. Retrying in the background.", "error")
+            elif is_training():
+                flash("The model is still being trained, please try again in a moment.", "error")
+            else:
+                flash(get_models()['results'].get('error', "No trained model is available."), "error")
+            return render_template('create_prediction.html', teams=teams)
 
         new_prediction = Prediction(
             user_id=current_user.id,
             home_team=home_team,
             visitor_team=visitor_team,
             lr_prob_team1_win=probs.get('lr_prob_team1_win'),
-            rf_prob_team1_win=probs.get('rf_prob_team1_win')
+            rf_prob_team1_win=probs.get('rf_prob_team1_win'),
+            hgb_prob_team1_win=probs.get('hgb_prob_team1_win'),
+            elo_prob_team1_win=elo_match_probability(home_team, visitor_team)
         )
         db.session.add(new_prediction)
         db.session.commit()
 
+        # The game may already be in the database (predicted on game day).
+        if settle_predictions([(home_team, visitor_team)]):
+            db.session.commit()
+
         return redirect(url_for('main.predictions'))
 
     return render_template('create_prediction.html', teams=teams)
@@ -112,6 +165,7 @@ def delete_prediction(prediction_id):
     pred = Prediction.query.get_or_404(prediction_id)
     if pred.user_id != current_user.id:
         return "Forbidden", 403
+    unsettle_prediction(pred)
     db.session.delete(pred)
     db.session.commit()
     return redirect(url_for('main.predictions'))
@@ -119,63 +173,11 @@ def delete_prediction(prediction_id):
 @main_bp.route('/charts')
 @login_required
 def charts():
-    from app.models import Prediction, Game
-
-    predictions = Prediction.query.all()
-    games = Game.query.all()
-
-    metrics = {
-        "lr": {"TP": 0, "FP": 0},
-        "rf": {"TP": 0, "FP": 0},
-    }
-
-    scores = {"lr": 0, "rf": 0}
-
-    for pred in predictions:
-        game = next(
-            (g for g in games
-             if g.home_team == pred.home_team
-             and g.visitor_team == pred.visitor_team
-             and pred.created_at.date() <= g.date),
-            None
-        )
-        if not game:
-            continue
-
-        true_winner = game.home_team if game.home_score > game.visitor_score else game.visitor_team
-
-        if pred.lr_prob_team1_win is not None:
-            lr_pred_winner = pred.home_team if pred.lr_prob_team1_win >= 0.5 else pred.visitor_team
-            if lr_pred_winner == true_winner:
-                metrics["lr"]["TP"] += 1
-            else:
-                metrics["lr"]["FP"] += 1
-
-        if pred.rf_prob_team1_win is not None:
-            rf_pred_winner = pred.home_team if pred.rf_prob_team1_win >= 0.5 else pred.visitor_team
-            if rf_pred_winner == true_winner:
-                metrics["rf"]["TP"] += 1
-            else:
-                metrics["rf"]["FP"] += 1
-
-        if pred.lr_prob_team1_win is not None and pred.rf_prob_team1_win is not None:
-            lr_pred = pred.home_team if pred.lr_prob_team1_win >= 0.5 else pred.visitor_team
-            rf_pred = pred.home_team if pred.rf_prob_team1_win >= 0.5 else pred.visitor_team
-
-            if lr_pred == true_winner and rf_pred == true_winner:
-                if pred.lr_prob_team1_win > pred.rf_prob_team1_win:
-                    scores["lr"] += 1
-                else:
-                    scores["rf"] += 1
-            elif lr_pred == true_winner:
-                scores["lr"] += 1
-            elif rf_pred == true_winner:
-                scores["rf"] += 1
-            else:
-                if abs(pred.lr_prob_team1_win - 0.5) < abs(pred.rf_prob_team1_win - 0.5):
-                    scores["lr"] += 1
-                else:
-                    scores["rf"] += 1
-
+    metrics, scores = model_stats()
     return render_template("charts.html", results=metrics, scores=scores)
 
+@main_bp.route('/leaderboard')
+@login_required
+def leaderboard():
+    return render_template('leaderboard.html', rows=user_leaderboard())
+
@@ -0,0 +1,66 @@
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class JobFailed(Exception):
+    """Raised by a job to record a failure that was already reported."""
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class JobRunner:
+    """
+    Runs jobs one at a time on a background thread, each in an app
+    context, and keeps the status of the latest one: state ('idle',
+    'running' or 'failed'), started_at, finished_at, error and the fields
+    the job module adds. `lock` also guards the modules' own bookkeeping.
+    """
+
+    def __init__(self, thread_name_prefix, **fields):
+        self.lock = threading.RLock()
+        self._thread_name_prefix = thread_name_prefix
+        self._executor = None
+        self._fields = fields
+        self._status = {'state': 'idle', 'started_at': None, 'finished_at': None, 'error': None, **fields}
+
+    def submit(self, app, job, **fields):
+        """
+        Queues job() and returns its Future. `fields` are set in the status
+        when it starts; the job can add more with update().
+        """
+        with self.lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self._thread_name_prefix)
+            return self._executor.submit(self._run, app, job, fields)
+
+    def _run(self, app, job, fields):
+        with self.lock:
+            self._status.update(
+                state='running', started_at=_now(), finished_at=None, error=None, **dict(self._fields, **fields)
+            )
+
+        try:
+            with app.app_context():
+                result = job()
+        except JobFailed as e:
+            self.update(state='failed', finished_at=_now(), error=str(e))
+            return None
+        except Exception as e:
+            traceback.print_exc()
+            self.update(state='failed', finished_at=_now(), error=str(e))
+            raise
+
+        self.update(state='idle', finished_at=_now())
+        return result
+
+    def update(self, **fields):
+        with self.lock:
+            self._status.update(fields)
+
+    def status(self):
+        with self.lock:
+            return dict(self._status)
@@ -0,0 +1,195 @@
+"""
+Walk-forward (rolling-origin) backtesting of the prediction engines.
+
+The date-ordered game history is cut into consecutive test windows; each
+fold trains on the games before its window and scores the window. Features
+are built once and every fold only slices them by index (the rolling-form
+features only look at earlier games, so this doesn't leak), and folds run
+in parallel across a process pool.
+
+Run from the slamlytics directory:
+    python backtest.py --folds 8 --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.metrics import accuracy_score, brier_score_loss, log_loss, roc_auc_score
+
+from ml_models import (
+    DEFAULT_WEIGHTING,
+    MODEL_PARAMS,
+    _prepare_dataframe,
+    elo_pregame_probabilities,
+    make_model,
+    model_input,
+    recency_weights,
+)
+
+ENGINES = list(MODEL_PARAMS) + ['elo']
+
+_shared = {}
+
+
+def walk_forward_folds(n_games, n_folds=5, min_train=None, test_size=None, max_train=None):
+    """
+    Returns (train_start, train_end, test_end) index bounds for each fold.
+    Training windows expand from the first game unless max_train caps them
+    to a rolling window; test windows are consecutive and never overlap.
+    """
+    min_train = min_train if min_train is not None else n_games // 2
+    if test_size is None:
+        test_size = (n_games - min_train) // n_folds
+    if min_train < 1 or test_size < 1:
+        raise ValueError("Not enough games for the requested folds.")
+
+    folds = []
+    for fold in range(n_folds):
+        train_end = min_train + fold * test_size
+        if train_end >= n_games:
+            break
+        test_end = n_games if fold == n_folds - 1 else min(train_end + test_size, n_games)
+        train_start = max(0, train_end - max_train) if max_train else 0
+        folds.append((train_start, train_end, test_end))
+    return folds
+
+
+def _init_worker(X, y, frame, elo_probs, weighting):
+    _shared.update(X=X, y=y, frame=frame, elo=elo_probs, weighting=weighting)
+
+
+def _score(y_true, probs):
+    probs = np.clip(probs, 1e-6, 1 - 1e-6)
+    both_classes = len(np.unique(y_true)) == 2
+    return {
+        'accuracy': float(accuracy_score(y_true, probs >= 0.5)),
+        'auc': float(roc_auc_score(y_true, probs)) if both_classes else None,
+        'log_loss': float(log_loss(y_true, probs, labels=[0, 1])),
+        'brier': float(brier_score_loss(y_true, probs)),
+    }
+
+
+def _run_fold(fold, train_start, train_end, test_end, engines):
+    fold_start = time.perf_counter()
+    X, y, frame = _shared['X'], _shared['y'], _shared['frame']
+    train, test = slice(train_start, train_end), slice(train_end, test_end)
+
+    y_train, y_test = y[train], y[test]
+    weights = recency_weights(frame.iloc[train], _shared['weighting'])
+
+    scores = {}
+    for name in engines:
+        start = time.perf_counter()
+        if name == 'elo':
+            probs = _shared['elo'][test]
+        elif len(np.unique(y_train)) < 2:
+            continue
+        else:
+            model = make_model(name)
+            model.fit(model_input(name, X[train]), y_train, sample_weight=weights)
+            probs = model.predict_proba(model_input(name, X[test]))[:, 1]
+        scores[name] = _score(y_test, probs)
+        scores[name]['seconds'] = round(time.perf_counter() - start, 4)
+
+    return {
+        'fold': fold,
+        'train_games': train_end - train_start,
+        'test_games': test_end - train_end,
+        'test_from': str(frame['date'].iloc[train_end].date()),
+        'test_to': str(frame['date'].iloc[test_end - 1].date()),
+        'wall_seconds': round(time.perf_counter() - fold_start, 4),
+        'engines': scores,
+    }
+
+
+def run_backtest(X, y, df, engines=None, n_folds=5, min_train=None, test_size=None,
+                 max_train=None, weighting=DEFAULT_WEIGHTING, workers=None):
+    """
+    Backtests the engines on a prepared (X, y, df) from _prepare_dataframe.
+    workers=1 runs the folds in this process; otherwise they are spread
+    across a process pool that receives the feature arrays once per worker.
+    """
+    engines = engines or ENGINES
+    y = np.asarray(y)
+    folds = walk_forward_folds(len(y), n_folds, min_train, test_size, max_train)
+
+    frame = df[['date', 'team1_id', 'team2_id']]
+    elo_probs = elo_pregame_probabilities(df) if 'elo' in engines else None
+    shared = (X, y, frame, elo_probs, weighting)
+
+    if workers == 1:
+        _init_worker(*shared)
+        return [_run_fold(i, *bounds, engines) for i, bounds in enumerate(folds)]
+
+    workers = workers or min(len(folds), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=shared) as pool:
+        futures = [pool.submit(_run_fold, i, *bounds, engines) for i, bounds in enumerate(folds)]
+        return [future.result() for future in futures]
+
+
+def summarize(folds):
+    """Mean of each metric per engine across folds (missing AUCs skipped)."""
+    summary = {}
+    for fold in folds:
+        for name, scores in fold['engines'].items():
+            for metric, value in scores.items():
+                if value is not None:
+                    summary.setdefault(name, {}).setdefault(metric, []).append(value)
+    return {
+        name: {metric: float(np.mean(values)) for metric, values in metrics.items()}
+        for name, metrics in summary.items()
+    }
+
+
+def print_report(folds):
+    print(f"{'fold':>4} {'test window':>23} {'train':>6} {'test':>5} {'engine':>6} "
+          f"{'acc':>6} {'auc':>6} {'logloss':>8} {'brier':>6} {'secs':>7}")
+    for fold in folds:
+        window = f"{fold['test_from']}..{fold['test_to']}"
+        for name, s in fold['engines'].items():
+            auc = f"{s['auc']:.3f}" if s['auc'] is not None else '-'
+            print(f"{fold['fold']:>4} {window:>23} {fold['train_games']:>6} {fold['test_games']:>5} {name:>6} "
+                  f"{s['accuracy']:>6.3f} {auc:>6} {s['log_loss']:>8.4f} {s['brier']:>6.4f} {s['seconds']:>7.3f}")
+        print(f"{'':>4} fold wall time {fold['wall_seconds']:.3f}s")
+
+    print("\nMean over folds:")
+    for name, metrics in summarize(folds).items():
+        print(f"  {name:>4}: " + ", ".join(f"{metric}={value:.4f}" for metric, value in metrics.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the prediction engines.")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--min-train', type=int, default=None, help="games in the first training window")
+    parser.add_argument('--test-size', type=int, default=None, help="games per test window")
+    parser.add_argument('--max-train', type=int, default=None, help="cap training to a rolling window")
+    parser.add_argument('--weighting', default=DEFAULT_WEIGHTING)
+    parser.add_argument('--engines', nargs='+', default=ENGINES, choices=ENGINES)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--json', help="also write the per-fold results to this file")
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        X, y, teams, df = _prepare_dataframe()
+
+    start = time.perf_counter()
+    folds = run_backtest(
+        X, y, df, engines=args.engines, n_folds=args.folds, min_train=args.min_train,
+        test_size=args.test_size, max_train=args.max_train, weighting=args.weighting,
+        workers=args.workers,
+    )
+    print_report(folds)
+    print(f"\nBacktest of {len(y)} games took {time.perf_counter() - start:.2f}s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'folds': folds, 'summary': summarize(folds)}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Compares worker cold start for the old pickled model artifacts and the
+compact memory-mapped format in model_artifacts.
+
+Both artifacts are built from the same synthetic training run. Each one
+is then loaded in a fresh interpreter, which scores every matchup once,
+as a worker would on its first request. The benchmark reports that
+process's wall time and peak RSS.
+
+Run from the slamlytics directory (peak RSS is read from /proc or the
+resource module, so Linux or macOS):
+    python -m benchmarks.bench_artifacts
+"""
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+
+REPEATS = 3
+SIZES = [6_000, 24_000]
+
+
+def _child(fmt, path):
+    start = time.perf_counter()
+    import numpy as np
+
+    if fmt == 'pickle':
+        with open(path, 'rb') as f:
+            artifact = pickle.load(f)
+    else:
+        from model_artifacts import read_artifact
+        artifact = read_artifact(path)
+    loaded = time.perf_counter() - start
+
+    n = len(artifact['teams'])
+    home, visitor = np.nonzero(~np.eye(n, dtype=bool))
+    design = np.zeros((len(home), n))
+    design[np.arange(len(home)), home] = 1
+    design[np.arange(len(home)), visitor] = -1
+    X = np.hstack([design, artifact['form'].pair_features(home, visitor)])
+    artifact['lr'].predict_proba(X)
+    artifact['rf'].predict_proba(X)
+    artifact['hgb'].predict_proba(X)
+
+    print(json.dumps({'load': loaded, 'total': time.perf_counter() - start, 'rss_mib': _peak_rss_mib()}))
+
+
+def _peak_rss_mib():
+    # Linux carries ru_maxrss over from the forking parent, VmHWM starts afresh.
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 2 ** 10
+    except OSError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2 ** 20 if sys.platform == 'darwin' else rss / 2 ** 10
+
+
+def _run_child(fmt, path):
+    best = None
+    for _ in range(REPEATS):
+        out = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_artifacts', '--child', fmt, path],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        if best is None or result['total'] < best['total']:
+            best = result
+    return best
+
+
+def _size_mib(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 2 ** 20
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 2 ** 20
+
+
+def _build(n_games, workdir):
+    from benchmarks.synthetic import make_app
+    from ml_models import current_form, probability_matrix, train_models
+    from model_artifacts import compact, write_artifact
+
+    app = make_app(n_games, workdir=workdir)
+    with app.app_context():
+        results, lr, rf, hgb = train_models(return_models=True)
+        form = current_form(results['teams'])
+    n_teams = len(results['teams'])
+    artifact = {
+        'fingerprint': 'bench',
+        'results': results,
+        'lr': lr,
+        'rf': rf,
+        'hgb': hgb,
+        'teams': results['teams'],
+        'form': form,
+        'matrices': {name: probability_matrix(model, n_teams, form) for name, model in (('lr', lr), ('rf', rf), ('hgb', hgb))},
+    }
+
+    pickle_path = os.path.join(workdir, 'models.pkl')
+    with open(pickle_path, 'wb') as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    compact_path = os.path.join(workdir, 'models')
+    write_artifact(compact_path, compact(artifact))
+    return pickle_path, compact_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model artifact cold-start benchmark.")
+    parser.add_argument('--child', nargs=2, metavar=('FORMAT', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(*args.child)
+        return
+
+    print(f"{'games':>7} {'format':>8} {'size MiB':>9} {'load (s)':>9} {'cold (s)':>9} {'RSS MiB':>8}")
+    for n_games in SIZES:
+        workdir = tempfile.mkdtemp(prefix='slamlytics-bench-')
+        paths = dict(zip(('pickle', 'compact'), _build(n_games, workdir)))
+        for fmt, path in paths.items():
+            result = _run_child(fmt, path)
+            print(f"{n_games:>7} {fmt:>8} {_size_mib(path):>9.1f} {result['load']:>9.3f} "
+                  f"{result['total']:>9.3f} {result['rss_mib']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
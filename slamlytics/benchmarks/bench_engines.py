@@ -0,0 +1,69 @@
+"""
+Compares the prediction engines of ml_models.MODEL_PARAMS on 1 and 20
+seasons of synthetic games: fit time, predict latency of the compact
+scorer the app serves (model_artifacts) for one matchup and for a full
+team x team matrix, and test AUC and log loss.
+
+Each engine is trained on the first 80% of the games by date, with the
+default recency weights, and tested on the rest, as a backtest fold would.
+
+Run from the slamlytics directory:
+    python -m benchmarks.bench_engines
+"""
+import time
+
+import numpy as np
+from sklearn.metrics import log_loss, roc_auc_score
+
+from benchmarks.synthetic import GAMES_PER_SEASON, make_app
+from benchmarks.timing import best_of
+from ml_models import MODEL_PARAMS, _prepare_dataframe, make_model, model_input, recency_weights
+from model_artifacts import compact
+
+SEASONS = [1, 20]
+REPEATS = 20
+TRAIN_SHARE = 0.8
+
+
+def compare_engines(n_games):
+    """{engine: {'fit', 'predict_one', 'predict_matrix', 'auc', 'log_loss'}} for n_games games."""
+    app = make_app(n_games)
+    with app.app_context():
+        X, y, teams, df = _prepare_dataframe()
+    y = y.to_numpy()
+    weights = recency_weights(df)
+    split = int(len(y) * TRAIN_SHARE)
+    X_test = X[split:].toarray()
+    n_pairs = len(teams) * (len(teams) - 1)
+    matrix_rows = np.resize(X_test, (n_pairs, X_test.shape[1]))
+
+    results = {}
+    for name in MODEL_PARAMS:
+        make_model(name)  # the first import of the estimator's module isn't fit time
+        model = make_model(name)
+        start = time.perf_counter()
+        model.fit(model_input(name, X[:split]), y[:split], sample_weight=weights[:split])
+        fit = time.perf_counter() - start
+
+        scorer = compact({name: model})[name]
+        probs = np.clip(scorer.predict_proba(X_test)[:, 1], 1e-6, 1 - 1e-6)
+        results[name] = {
+            'fit': fit,
+            'predict_one': best_of(lambda: scorer.predict_proba(X_test[:1]), REPEATS),
+            'predict_matrix': best_of(lambda: scorer.predict_proba(matrix_rows), REPEATS),
+            'auc': roc_auc_score(y[split:], probs),
+            'log_loss': log_loss(y[split:], probs, labels=[0, 1]),
+        }
+    return results
+
+
+def main():
+    print(f"{'seasons':>7} {'engine':>6} {'fit (s)':>8} {'1 pair (ms)':>12} {'matrix (ms)':>12} {'AUC':>6} {'log loss':>9}")
+    for seasons in SEASONS:
+        for name, result in compare_engines(GAMES_PER_SEASON * seasons).items():
+            print(f"{seasons:>7} {name:>6} {result['fit']:>8.2f} {result['predict_one'] * 1e3:>12.3f} "
+                  f"{result['predict_matrix'] * 1e3:>12.2f} {result['auc']:>6.3f} {result['log_loss']:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
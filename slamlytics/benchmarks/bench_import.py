@@ -0,0 +1,44 @@
+"""
+Times import_games.sync_games against the local stub API (see
+tests/conftest.py, which also checks the import itself under pytest).
+
+For each worker count a fresh database is filled from the same canned
+games (several cursor pages per date chunk, with per-request latency),
+then the sync is repeated, which only fetches from the watermark on.
+
+Run from the slamlytics directory:
+    python -m benchmarks.bench_import
+"""
+import time
+
+from benchmarks.synthetic import make_app
+from import_games import sync_games
+from tests.conftest import StubGamesAPI, synthetic_api_games
+
+GAMES = 2_000
+LATENCY = 0.02
+WORKERS = [1, 4, 8]
+
+
+def main():
+    games = synthetic_api_games(GAMES)
+
+    print(f"{'workers':>7} {'requests':>8} {'imported':>8} {'seconds':>8} {'re-sync requests':>16} {'re-sync s':>9}")
+    for workers in WORKERS:
+        app = make_app(0)
+        with StubGamesAPI([dict(game) for game in games], latency=LATENCY) as api, app.app_context():
+            start = time.perf_counter()
+            added = sync_games(api_url=api.url, workers=workers)
+            elapsed = time.perf_counter() - start
+            requests = api.requests
+
+            start = time.perf_counter()
+            sync_games(api_url=api.url, workers=workers)
+            resync = time.perf_counter() - start
+            resync_requests = api.requests - requests
+
+        print(f"{workers:>7} {requests:>8} {added:>8} {elapsed:>8.2f} {resync_requests:>16} {resync:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
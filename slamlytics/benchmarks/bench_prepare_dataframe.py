@@ -0,0 +1,43 @@
+"""
+Compares the ORM-based game loading that _prepare_dataframe used to do with
+the columnar Core SELECT in ml_models._load_games_frame.
+
+Run from the slamlytics directory:
+    python -m benchmarks.bench_prepare_dataframe
+"""
+import pandas as pd
+
+from app.models import Game
+from benchmarks.synthetic import make_app
+from benchmarks.timing import best_of
+from ml_models import _load_games_frame
+
+SIZES = [10_000, 100_000]
+
+
+def _orm_games_frame():
+    rows = []
+    for g in Game.query.order_by(Game.date).all():
+        rows.append({
+            'date': g.date,
+            'team1': g.home_team,
+            'team2': g.visitor_team,
+            'score1': g.home_score,
+            'score2': g.visitor_score,
+            'team1_win': 1 if g.home_score > g.visitor_score else 0,
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    print(f"{'games':>8} {'orm (s)':>10} {'columnar (s)':>13} {'speedup':>8}")
+    for n_games in SIZES:
+        app = make_app(n_games)
+        with app.app_context():
+            orm = best_of(_orm_games_frame)
+            columnar = best_of(_load_games_frame)
+        print(f"{n_games:>8} {orm:>10.3f} {columnar:>13.3f} {orm / columnar:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Times simulation.simulate_season on a full synthetic 82-game schedule.
+
+Run from the slamlytics directory:
+    python -m benchmarks.bench_simulation
+"""
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import NBA_TEAMS
+from simulation import elo_probability_matrix, simulate_season
+
+SIMULATIONS = [1_000, 10_000]
+GAMES = 1_230
+
+
+def synthetic_schedule(n_teams, n_games, seed=0):
+    rng = np.random.default_rng(seed)
+    home = rng.integers(0, n_teams, n_games)
+    visitor = (home + rng.integers(1, n_teams, n_games)) % n_teams
+    return home, visitor
+
+
+def main():
+    rng = np.random.default_rng(1)
+    matrix = elo_probability_matrix(1500 + rng.normal(0, 100, len(NBA_TEAMS)))
+    home, visitor = synthetic_schedule(len(NBA_TEAMS), GAMES)
+
+    print(f"{'seasons':>8} {'games':>6} {'seconds':>8} {'peak MiB':>9}")
+    for n_sims in SIMULATIONS:
+        tracemalloc.start()
+        start = time.perf_counter()
+        simulate_season(matrix, NBA_TEAMS, home, visitor, n_sims=n_sims, seed=42)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+        print(f"{n_sims:>8} {GAMES:>6} {elapsed:>8.2f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Times the old per-team weighting loop from train_models against the
+vectorized strategies in ml_models.WEIGHTING_STRATEGIES.
+
+Run from the slamlytics directory:
+    python -m benchmarks.bench_weighting
+"""
+import numpy as np
+
+from benchmarks.synthetic import GAMES_PER_SEASON, make_app
+from benchmarks.timing import best_of
+from ml_models import WEIGHTING_STRATEGIES, MAX_RECENCY_WEIGHT, _prepare_dataframe
+
+SEASONS = [1, 5, 20]
+
+
+def _legacy_team_loop(df, teams, max_weight=MAX_RECENCY_WEIGHT):
+    df = df.copy()
+    df['weight'] = 1.0
+    for team in teams:
+        team_games_idx = df[(df['team1'] == team) | (df['team2'] == team)].index
+        n = len(team_games_idx)
+        if n > 0:
+            df.loc[team_games_idx, 'weight'] = np.exp(np.linspace(0, np.log(max_weight), n))
+    return df['weight'].values
+
+
+def main():
+    names = list(WEIGHTING_STRATEGIES)
+    print(f"{'seasons':>7} {'games':>7} {'legacy (ms)':>12} " + " ".join(f"{name + ' (ms)':>16}" for name in names))
+    for seasons in SEASONS:
+        app = make_app(seasons * GAMES_PER_SEASON)
+        with app.app_context():
+            X, y, teams, df = _prepare_dataframe()
+
+        legacy = best_of(lambda: _legacy_team_loop(df, teams))
+        timings = [best_of(lambda: strategy(df)) for strategy in WEIGHTING_STRATEGIES.values()]
+        print(f"{seasons:>7} {len(df):>7} {legacy * 1000:>12.1f} " + " ".join(f"{t * 1000:>16.1f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+EXPLAIN QUERY PLAN check for the hot Game and Prediction queries.
+
+Each query is built the way the app builds it and compiled for SQLite; the
+check fails when its plan no longer uses the expected index or scans the
+game/prediction table without one, so a schema or query change can't
+quietly fall back to a full table scan. tests/test_query_plans.py runs
+the same check under pytest.
+
+Run from the slamlytics directory:
+    python -m benchmarks.query_plans                  # synthetic database from the models
+    python -m benchmarks.query_plans --database app/instance/site.db   # a migrated database
+"""
+import argparse
+import datetime
+import os
+import re
+import sys
+
+from sqlalchemy import text
+
+from app import create_app, db
+from app.models import Game, Prediction
+from benchmarks.synthetic import make_app
+from prediction_results import _pending_query
+
+SAMPLE_DATE = datetime.date(2024, 1, 15)
+
+UNINDEXED_SCAN = re.compile(r'\bSCAN (game|prediction)\b(?! USING)')
+
+
+def hot_queries():
+    """(name, statement, indexes the plan must use)"""
+    return [
+        (
+            '/games page',
+            Game.query.order_by(Game.date.desc()).limit(30).offset(30).statement,
+            ['ix_game_date'],
+        ),
+        (
+            'prediction settlement',
+            _pending_query(),
+            ['ix_prediction_resolved_game_id', 'ix_game_matchup'],
+        ),
+        (
+            'excel importer dedupe',
+            Game.query.filter_by(
+                date=SAMPLE_DATE, home_team='BOS', visitor_team='NYK',
+                home_score=110, visitor_score=102,
+            ).limit(1).statement,
+            ['ix_game_matchup'],
+        ),
+        (
+            '/my-predictions',
+            Prediction.query.filter_by(user_id=1).statement,
+            ['ix_prediction_user_id'],
+        ),
+    ]
+
+
+def query_plan(statement):
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)).all()
+    return [row[-1] for row in rows]
+
+
+def check_plans(verbose=False):
+    failures = []
+    for name, statement, indexes in hot_queries():
+        plan = query_plan(statement)
+        if verbose:
+            print(f"{name}:")
+            for line in plan:
+                print(f"    {line}")
+
+        for index in indexes:
+            if not any(re.search(rf'\bINDEX {index}\b', line) for line in plan):
+                failures.append(f"{name}: does not use {index}")
+        for line in plan:
+            if UNINDEXED_SCAN.search(line):
+                failures.append(f"{name}: full table scan ({line})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the query plans of the hot queries.")
+    parser.add_argument('--database', help="SQLite file to check instead of a synthetic database")
+    parser.add_argument('--games', type=int, default=2_000, help="games in the synthetic database")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    if args.database:
+        # Flask-SQLAlchemy resolves relative SQLite paths against the instance folder.
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.abspath(args.database)})
+    else:
+        app = make_app(args.games)
+
+    with app.app_context():
+        failures = check_plans(args.verbose)
+
+    if failures:
+        print("Query plan regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("All hot queries use their indexes.")
+
+
+if __name__ == "__main__":
+    main()
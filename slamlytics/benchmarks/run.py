@@ -0,0 +1,193 @@
+"""
+Benchmark suite for the ML and route hot paths.
+
+For every scenario (seasons x teams) a temporary SQLite database is filled
+with synthetic games (scenarios with more than ml_models.MAX_TEAMS teams
+are suffixed -top30: the models only keep the busiest 30); the suite then times _prepare_dataframe,
+train_models and predict_match directly, and /charts, /games and
+/create-prediction through the Flask test client. Wall time is the best of
+a few runs, peak memory is measured in a separate run under tracemalloc.
+App startup (create_app() in a fresh interpreter, see benchmarks.startup)
+is measured once and fails the run if it imports the ML stack.
+
+Run from the slamlytics directory:
+    python -m benchmarks.run                    # compare against baseline.json
+    python -m benchmarks.run --update-baseline  # record a new baseline
+    python -m benchmarks.run --seasons 1 --teams 30
+
+Exits with status 1 when a measurement regresses past --threshold.
+"""
+import argparse
+import json
+import os
+import sys
+
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import Prediction, User
+from benchmarks.startup import heavy_imports, measure_startup
+from benchmarks.synthetic import GAMES_PER_SEASON, make_app, synthetic_teams
+from benchmarks.timing import REPEATS, measure
+from ml_models import MAX_TEAMS, MODEL_PARAMS, _prepare_dataframe, current_form, make_model, predict_match, train_models
+from model_registry import build_artifact
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SEASONS = [1, 5, 20]
+TEAM_COUNTS = [30, 60]
+DEFAULT_THRESHOLD = 0.25
+SEEDED_PREDICTIONS = 200
+
+# Differences below these are treated as noise regardless of the ratio.
+MIN_DELTA = {'seconds': 0.005, 'peak_mib': 1.0}
+
+BENCH_USER = 'bench'
+BENCH_PASSWORD = 'Bench!2345'
+
+
+def _seed_users_and_predictions(teams):
+    user = User(username=BENCH_USER, password=generate_password_hash(BENCH_PASSWORD, method='pbkdf2:sha256'))
+    db.session.add(user)
+    db.session.flush()
+
+    for i in range(SEEDED_PREDICTIONS):
+        home, visitor = teams[i % len(teams)], teams[(i * 7 + 1) % len(teams)]
+        if home == visitor:
+            continue
+        db.session.add(Prediction(
+            user_id=user.id, home_team=home, visitor_team=visitor,
+            lr_prob_team1_win=0.6, rf_prob_team1_win=0.4,
+        ))
+    db.session.commit()
+
+
+def _checked(client, method, url, expected=(200, 302), **kwargs):
+    def call():
+        response = getattr(client, method)(url, **kwargs)
+        if response.status_code not in expected:
+            raise RuntimeError(f"{method.upper()} {url} returned {response.status_code}")
+    return call
+
+
+def run_scenario(seasons, n_teams, repeats=REPEATS):
+    n_games = seasons * GAMES_PER_SEASON * n_teams // 30
+    app = make_app(n_games, n_teams=n_teams)
+    teams = synthetic_teams(n_teams)
+    results = {}
+
+    with app.app_context():
+        results['prepare_dataframe'] = measure(_prepare_dataframe, repeats)
+
+        # scikit-learn is imported on first use; keep that one-off cost out of the timing.
+        for name in MODEL_PARAMS:
+            make_model(name)
+
+        trained = {}
+        def train():
+            trained['results'], trained['lr'], trained['rf'], trained['hgb'] = train_models(return_models=True)
+        results['train_models'] = measure(train, repeats=1)
+
+        model_teams = trained['results']['teams']
+        form = current_form(model_teams)
+        home, visitor = model_teams[0], model_teams[1]
+        results['predict_match'] = measure(
+            lambda: predict_match(
+                home, visitor, trained['lr'], trained['rf'], teams=model_teams, form=form, hgb_model=trained['hgb']
+            ),
+            repeats,
+        )
+
+        build_artifact()
+        _seed_users_and_predictions(teams)
+
+    client = app.test_client()
+    client.post('/login', data={'username': BENCH_USER, 'password': BENCH_PASSWORD})
+
+    results['route_charts'] = measure(_checked(client, 'get', '/charts'), repeats)
+    results['route_games'] = measure(_checked(client, 'get', '/games?page=2'), repeats)
+    results['route_create_prediction'] = measure(
+        _checked(client, 'post', '/create-prediction', data={'home_team': home, 'visitor_team': visitor}),
+        repeats,
+    )
+    return n_games, results
+
+
+def scenario_name(seasons, n_teams):
+    # The models only keep the MAX_TEAMS teams with the most games, so a
+    # larger league is more games to load and filter, not a bigger model.
+    name = f"{seasons}s-{n_teams}t"
+    return f"{name}-top{MAX_TEAMS}" if n_teams > MAX_TEAMS else name
+
+
+def compare(current, baseline, threshold):
+    failures = []
+    for key, metrics in current.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric, value in metrics.items():
+            base = reference.get(metric)
+            if base is None:
+                continue
+            if value > base * (1 + threshold) and value - base > MIN_DELTA[metric]:
+                failures.append(f"{key} {metric}: {value} vs baseline {base} (+{(value / base - 1):.0%})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slamlytics benchmark suite.")
+    parser.add_argument('--seasons', type=int, nargs='+', default=SEASONS)
+    parser.add_argument('--teams', type=int, nargs='+', default=TEAM_COUNTS)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative slowdown / memory growth (0.25 = 25%%)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    current = {}
+    print(f"{'scenario':>14} {'benchmark':>24} {'seconds':>9} {'peak MiB':>9}")
+
+    startup_seconds, startup_imports = measure_startup(args.repeats)
+    current['startup/create_app'] = {'seconds': round(startup_seconds, 5)}
+    print(f"{'startup':>14} {'create_app':>24} {startup_seconds:>9.4f} {'-':>9}")
+    eager_ml = heavy_imports(startup_imports)
+    for seasons in args.seasons:
+        for n_teams in args.teams:
+            n_games, results = run_scenario(seasons, n_teams, args.repeats)
+            scenario = scenario_name(seasons, n_teams)
+            for name, metrics in results.items():
+                current[f"{scenario}/{name}"] = metrics
+                print(f"{scenario:>14} {name:>24} {metrics['seconds']:>9.4f} {metrics['peak_mib']:>9.2f}")
+            print(f"{'':>14} ({n_games} games)")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(current)
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(sorted(baseline.items())), f, indent=2)
+            f.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline yet; run with --update-baseline to record one.")
+        return
+
+    with open(args.baseline) as f:
+        failures = compare(current, json.load(f), args.threshold)
+    if eager_ml:
+        failures.append(f"startup imports the ML stack: {', '.join(eager_ml)}")
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Measures app startup: a fresh interpreter imports the app package and
+calls create_app(), under `python -X importtime`. Reports the wall time,
+the slowest top-level imports and whether any of the ML stack (pandas,
+NumPy, SciPy, scikit-learn) was loaded, which should only happen on
+first use. benchmarks.run includes this measurement as startup/create_app.
+
+Run from the slamlytics directory:
+    python -m benchmarks.startup
+"""
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+REPEATS = 3
+HEAVY_MODULES = ('pandas', 'numpy', 'scipy', 'sklearn')
+STARTUP_CODE = "from app import create_app; create_app({'SQLALCHEMY_DATABASE_URI': %r})"
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _run_once():
+    db_path = os.path.join(tempfile.mkdtemp(prefix='slamlytics-bench-'), 'startup.db')
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE % ('sqlite:///' + db_path)],
+        capture_output=True, text=True, check=True,
+    )
+    seconds = time.perf_counter() - start
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+            imports.append((name, cumulative / 1e6, indent // 2))
+    return seconds, imports
+
+
+def measure_startup(repeats=REPEATS):
+    """
+    Best-of-`repeats` startup. Returns (seconds, imports), where imports
+    lists (module, cumulative seconds, depth) for that run.
+    """
+    best = None
+    for _ in range(repeats):
+        run = _run_once()
+        if best is None or run[0] < best[0]:
+            best = run
+    return best
+
+
+def heavy_imports(imports):
+    return sorted({name.split('.')[0] for name, _, _ in imports if name.split('.')[0] in HEAVY_MODULES})
+
+
+def main():
+    seconds, imports = measure_startup()
+    print(f"create_app() in a fresh interpreter: {seconds:.3f}s")
+
+    print("\nSlowest top-level imports:")
+    top_level = sorted((entry for entry in imports if entry[2] == 0), key=lambda entry: entry[1], reverse=True)
+    for name, cumulative, _ in top_level[:10]:
+        print(f"  {cumulative:>7.3f}s  {name}")
+
+    loaded = heavy_imports(imports)
+    if loaded:
+        print(f"\nML stack imported at startup: {', '.join(loaded)}")
+        sys.exit(1)
+    print("\nNo ML modules imported at startup.")
+
+
+if __name__ == "__main__":
+    main()
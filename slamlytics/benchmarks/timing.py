@@ -0,0 +1,31 @@
+"""
+Timing helpers shared by the benchmark scripts.
+"""
+import time
+import tracemalloc
+
+REPEATS = 3
+
+
+def best_of(func, repeats=REPEATS):
+    """Fastest wall time of `repeats` calls of func, in seconds."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(func, repeats=REPEATS):
+    """best_of(), plus the peak traced memory of one more call under tracemalloc."""
+    best = best_of(func, repeats)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': round(best, 5), 'peak_mib': round(peak / 2 ** 20, 3)}
@@ -0,0 +1,216 @@
+"""
+Rolling-form features of each team going into a game.
+
+For every game the home and the visitor side get: mean margin over the
+team's last 5 and 10 games, its current win (+) or losing (-) streak,
+days of rest and a back-to-back flag, plus the home team's win rate in
+its recent home games and the visitor's in its recent away games. Only
+games before the one being described are used, so the features are
+leak-free and a backtest can slice them by index.
+
+Games are passed as a frame in chronological order with columns day
+(days since 1970-01-01), home, visitor (integer team codes), home_score
+and visitor_score. Everything runs on a long one-row-per-team-per-game
+frame with groupby().shift() / rolling(); there is no Python loop over
+games.
+
+extend_form_features() adds games at the end of a history from just its
+form_tail(), which is how the game archive keeps the features of
+appended games up to date without recomputing the whole history.
+TeamForm is the same state after the latest game, which trained models
+need to score matchups that haven't been played.
+"""
+import datetime
+
+import numpy as np
+
+FORM_VERSION = 1
+FORM_WINDOWS = (5, 10)
+SPLIT_WINDOW = 20
+STREAK_CAP = 10
+# The first game of a team, and any longer break, counts as this many days of rest.
+REST_CAP = 7
+
+TEAM_FEATURES = [f'margin_{window}' for window in FORM_WINDOWS] + ['streak', 'rest_days', 'back_to_back']
+FORM_FEATURES = (
+    [f'home_{name}' for name in TEAM_FEATURES] + ['home_home_rate']
+    + [f'visitor_{name}' for name in TEAM_FEATURES] + ['visitor_away_rate']
+)
+# Every team's last TAIL home and TAIL away games cover all of the windows above.
+TAIL = max(max(FORM_WINDOWS), SPLIT_WINDOW, STREAK_CAP)
+
+GAME_COLUMNS = ['day', 'home', 'visitor', 'home_score', 'visitor_score']
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def _team_log(games):
+    """One row per team per game, ordered by team and then game."""
+    import pandas as pd
+
+    n = len(games)
+    home_margin = games['home_score'].to_numpy(dtype=np.int64) - games['visitor_score'].to_numpy(dtype=np.int64)
+    log = pd.DataFrame({
+        'game': np.tile(np.arange(n), 2),
+        'team': np.concatenate([games['home'].to_numpy(), games['visitor'].to_numpy()]),
+        'is_home': np.repeat([True, False], n),
+        'day': np.tile(games['day'].to_numpy(dtype=np.int64), 2),
+        'margin': np.concatenate([home_margin, -home_margin]).astype(np.float64),
+    })
+    log['win'] = (log['margin'] > 0).astype(np.float64)
+    return log.sort_values(['team', 'game'], kind='stable').reset_index(drop=True)
+
+
+def _rolling(values, keys, window, how):
+    rolled = getattr(values.groupby(keys, sort=False).rolling(window, min_periods=1), how)()
+    return rolled.reset_index(level=list(range(len(keys))), drop=True).sort_index()
+
+
+def _pregame(log):
+    """Adds each row's features going into that game, from earlier rows only."""
+    team = log['team']
+    by_team = log.groupby('team', sort=False)
+
+    previous_margin = by_team['margin'].shift(1)
+    for window in FORM_WINDOWS:
+        log[f'margin_{window}'] = _rolling(previous_margin, [team], window, 'mean').fillna(0.0)
+
+    # Signed length of the run of wins or losses each game ends.
+    new_run = log['win'].ne(by_team['win'].shift(1))
+    run_length = log.groupby(new_run.cumsum()).cumcount() + 1
+    after_game = np.where(log['win'] > 0, run_length, -run_length)
+    streak = log.assign(after=after_game).groupby('team', sort=False)['after'].shift(1)
+    log['streak'] = streak.fillna(0).clip(-STREAK_CAP, STREAK_CAP)
+
+    rest = log['day'] - by_team['day'].shift(1)
+    log['rest_days'] = rest.fillna(REST_CAP).clip(upper=REST_CAP)
+    log['back_to_back'] = (log['rest_days'] <= 1).astype(np.float64)
+
+    # Win rate in the same venue (home or away), shrunk towards 0.5.
+    venue = [team, log['is_home']]
+    previous_win = log.groupby(venue, sort=False)['win'].shift(1)
+    wins = _rolling(previous_win, venue, SPLIT_WINDOW, 'sum').fillna(0.0)
+    played = _rolling(previous_win, venue, SPLIT_WINDOW, 'count')
+    log['venue_rate'] = (wins + 1) / (played + 2)
+    return log
+
+
+def _game_matrix(log, n_games):
+    """Folds the per-team rows back into one FORM_FEATURES row per game."""
+    features = np.empty((n_games, len(FORM_FEATURES)))
+    width = len(TEAM_FEATURES) + 1
+    for offset, is_home in ((0, True), (width, False)):
+        side = log[log['is_home'] == is_home]
+        features[side['game'].to_numpy(), offset:offset + width] = side[TEAM_FEATURES + ['venue_rate']].to_numpy()
+    return features
+
+
+def form_features(games):
+    """FORM_FEATURES of every game in the chronological `games` frame, as an array."""
+    if len(games) == 0:
+        return np.empty((0, len(FORM_FEATURES)))
+    return _game_matrix(_pregame(_team_log(games)), len(games))
+
+
+def form_tail(games):
+    """
+    Boolean mask of the games in chronological `games` that
+    extend_form_features() needs: each team's last TAIL home and away games.
+    """
+    import pandas as pd
+
+    n = len(games)
+    keep = np.zeros(n, dtype=bool)
+    for column in ('home', 'visitor'):
+        from_end = pd.Series(np.arange(n)).groupby(games[column].to_numpy()).cumcount(ascending=False)
+        keep |= from_end.to_numpy() < TAIL
+    return keep
+
+
+def extend_form_features(tail, new_games):
+    """
+    FORM_FEATURES of `new_games`, which are played after every game of a
+    history whose form_tail() is `tail`. Both frames are chronological.
+    """
+    import pandas as pd
+
+    if len(new_games) == 0:
+        return np.empty((0, len(FORM_FEATURES)))
+    combined = pd.concat([tail[GAME_COLUMNS], new_games[GAME_COLUMNS]], ignore_index=True)
+    return form_features(combined)[len(tail):]
+
+
+class TeamForm:
+    """
+    Each team's form after its latest game: values holds margin_5,
+    margin_10, streak, home_rate and away_rate per team code, last_day
+    the day of its latest game (-1 if it has none). pair_features()
+    turns it into FORM_FEATURES rows for matchups played on a given day.
+    """
+
+    def __init__(self, values, last_day):
+        self.values = values
+        self.last_day = last_day
+
+    @classmethod
+    def from_games(cls, games, n_teams):
+        """The form of team codes 0..n_teams-1 after the chronological `games`."""
+        import pandas as pd
+
+        values = np.zeros((n_teams, len(FORM_WINDOWS) + 3))
+        values[:, -2:] = 0.5
+        last_day = np.full(n_teams, -1, dtype=np.int64)
+        if len(games) == 0 or n_teams == 0:
+            return cls(values, last_day)
+
+        tail = games[GAME_COLUMNS][form_tail(games)]
+        next_day = int(tail['day'].max()) + 1
+        teams = np.arange(n_teams)
+        # A made-up next game for every team, at home and away, described
+        # by the same pipeline as real games (its own score is never used).
+        for is_home in (True, False):
+            opponents = np.full(n_teams, -1)
+            upcoming = pd.DataFrame({
+                'day': next_day,
+                'home': teams if is_home else opponents,
+                'visitor': opponents if is_home else teams,
+                'home_score': 0,
+                'visitor_score': 0,
+            })
+            log = _pregame(_team_log(pd.concat([tail, upcoming], ignore_index=True)))
+            log = log[(log['game'] >= len(tail)) & (log['team'] >= 0)]
+            codes = log['team'].to_numpy()
+            if is_home:
+                values[codes, :len(FORM_WINDOWS) + 1] = log[[f'margin_{w}' for w in FORM_WINDOWS] + ['streak']].to_numpy()
+                values[codes, -2] = log['venue_rate'].to_numpy()
+            else:
+                values[codes, -1] = log['venue_rate'].to_numpy()
+
+        for column in ('home', 'visitor'):
+            latest = tail.groupby(column)['day'].max()
+            latest = latest[(latest.index >= 0) & (latest.index < n_teams)]
+            last_day[latest.index] = np.maximum(last_day[latest.index], latest.to_numpy())
+        return cls(values, last_day)
+
+    def pair_features(self, home_ids, visitor_ids, as_of=None):
+        """
+        FORM_FEATURES rows for (home, visitor) team codes meeting on the
+        date as_of (default today). Codes of -1 get neutral values.
+        """
+        as_of = as_of or datetime.date.today()
+        day = (as_of - EPOCH).days
+        n_windows = len(FORM_WINDOWS)
+
+        def side(ids, rate_column):
+            ids = np.asarray(ids)
+            known = ids >= 0
+            safe = np.where(known, ids, 0)
+            values = self.values[safe]
+            last = self.last_day[safe]
+            rest = np.where(known & (last >= 0), np.clip(day - last, 0, REST_CAP), REST_CAP)
+            columns = [values[:, :n_windows + 1], rest[:, None], (rest <= 1)[:, None], values[:, [rate_column]]]
+            block = np.hstack([np.asarray(c, dtype=np.float64) for c in columns])
+            neutral = [0.0] * (n_windows + 1) + [REST_CAP, 0.0, 0.5]
+            block[~known] = neutral
+            return block
+
+        return np.hstack([side(home_ids, -2), side(visitor_ids, -1)])
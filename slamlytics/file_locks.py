@@ -0,0 +1,44 @@
+"""
+Exclusive advisory file locks between the processes of a pre-fork server
+(see gunicorn.conf.py). Without fcntl (Windows) only single-process
+servers are supported, so there is nothing to serialize and the locks are
+no-ops.
+"""
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path):
+    """Holds an exclusive lock on `path` for the with block, waiting for it if need be."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def try_file_lock(path):
+    """
+    Non-blocking exclusive lock on `path`, held until the returned file is
+    closed (True without fcntl). Returns None if another process holds it.
+    """
+    if fcntl is None:
+        return True
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    f = open(path, 'a')
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
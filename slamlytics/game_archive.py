@@ -0,0 +1,373 @@
+"""
+Append-only columnar snapshot of the game history for training reads.
+
+Every column is a flat binary file opened with np.memmap, so readers (and
+separate worker processes) share the page-cached data instead of each
+materializing rows from the database. meta.json holds the row count, the
+team list the code columns index into, the highest archived Game.id and a
+fingerprint of the archived rows computed the same way as
+data_fingerprint() does for the table.
+
+Appends only ever add rows past the count in meta.json, which is replaced
+atomically, so readers never see a partial row and don't take the lock.
+When the table changed in a way an append can't express (score
+corrections, deletions, or games dated before the latest archived one)
+the archive is rewritten under a new generation of file names; the files
+of the previous generation are kept for readers that are still on it.
+
+Next to the game columns the archive stores each game's pregame
+FORM_FEATURES (see features), one float64 row per game. An append
+computes them for the new games from the tail of the history only.
+"""
+import datetime
+import glob
+import hashlib
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from flask import current_app
+from sqlalchemy import func, select
+
+from app import db
+from app.models import Game, SyncState
+from features import FORM_FEATURES, FORM_VERSION, extend_form_features, form_features, form_tail
+from file_locks import file_lock
+
+ARCHIVE_VERSION = 2
+COLUMNS = {
+    'id': np.int64,
+    'date': np.int64,  # days since 1970-01-01
+    'home': np.int16,
+    'visitor': np.int16,
+    'home_score': np.int16,
+    'visitor_score': np.int16,
+}
+FORM_COLUMN = 'form'  # len(FORM_FEATURES) float64 values per game
+EPOCH = datetime.date(1970, 1, 1)
+
+_lock = threading.Lock()
+
+
+def _fingerprint(count, max_date, id_sum, checksum):
+    digest = hashlib.sha1(f"{count}|{max_date}|{id_sum}|{checksum}".encode()).hexdigest()[:12]
+    return f"{count}-{max_date or 'empty'}-{digest}"
+
+
+def data_fingerprint():
+    """
+    Cheap fingerprint of the Game table: row count, latest date and a
+    checksum over ids and scores, computed with a single aggregate query.
+    """
+    count, max_date, id_sum, checksum = db.session.query(
+        func.count(Game.id),
+        func.max(Game.date),
+        func.coalesce(func.sum(Game.id), 0),
+        func.coalesce(func.sum(Game.id * (Game.home_score * 1000 + Game.visitor_score)), 0),
+    ).one()
+    return _fingerprint(count, max_date, id_sum, checksum)
+
+
+def data_version():
+    """
+    Version stamp of the Game table: the data_version of every SyncState
+    row, which each importer replaces when it writes games. Unlike
+    data_fingerprint() it costs a lookup in a table of one row per source.
+    """
+    return tuple(tuple(row) for row in db.session.execute(
+        select(SyncState.source, SyncState.data_version).order_by(SyncState.source)
+    ))
+
+
+def mark_games_changed(source):
+    """Gives source's SyncState row a new data_version, in the caller's transaction."""
+    state = db.session.get(SyncState, source)
+    if state is None:
+        state = SyncState(source=source)
+        db.session.add(state)
+    # A fresh token rather than a counter, so a rolled back import can't
+    # leave a cached fingerprint behind for a version that is reused later.
+    state.data_version = uuid.uuid4().hex
+
+
+def current_fingerprint():
+    """
+    data_fingerprint(), recomputed only when data_version() changed since
+    the last call in this process for the app. The request path uses this
+    instead of aggregating over the whole Game table every time.
+    """
+    version = data_version()
+    cached = current_app.extensions.get('data_fingerprint')
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    fingerprint = data_fingerprint()
+    current_app.extensions['data_fingerprint'] = (version, fingerprint)
+    return fingerprint
+
+
+def _archive_fingerprint(columns):
+    if len(columns['id']) == 0:
+        return _fingerprint(0, None, 0, 0)
+    ids = columns['id']
+    scores = columns['home_score'].astype(np.int64) * 1000 + columns['visitor_score']
+    max_date = EPOCH + datetime.timedelta(days=int(columns['date'].max()))
+    return _fingerprint(len(ids), max_date, int(ids.sum()), int((ids * scores).sum()))
+
+
+def _archive_dir():
+    return current_app.config.get('GAME_ARCHIVE_DIR')
+
+
+def _path(archive_dir, name, generation):
+    return os.path.join(archive_dir, f"{name}.{generation}.bin")
+
+
+def _read_meta(archive_dir):
+    try:
+        with open(os.path.join(archive_dir, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != ARCHIVE_VERSION or meta.get('form_version') != FORM_VERSION:
+        return None
+    return meta
+
+
+def _write_meta(archive_dir, meta):
+    path = os.path.join(archive_dir, 'meta.json')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, path)
+
+
+def _shapes(count):
+    shapes = {name: (dtype, (count,)) for name, dtype in COLUMNS.items()}
+    shapes[FORM_COLUMN] = (np.float64, (count, len(FORM_FEATURES)))
+    return shapes
+
+
+def _open_columns(archive_dir, meta):
+    count = meta['count']
+    if count == 0:
+        return {name: np.empty(shape, dtype=dtype) for name, (dtype, shape) in _shapes(0).items()}
+    return {
+        name: np.memmap(_path(archive_dir, name, meta['generation']), dtype=dtype, mode='r', shape=shape)
+        for name, (dtype, shape) in _shapes(count).items()
+    }
+
+
+@contextmanager
+def _archive_lock(archive_dir):
+    """Serializes writers within the process and across processes."""
+    with _lock, file_lock(os.path.join(archive_dir, '.lock')):
+        yield
+
+
+def _fetch_rows(after_id=None):
+    stmt = select(
+        Game.id, Game.date, Game.home_team, Game.visitor_team, Game.home_score, Game.visitor_score
+    ).order_by(Game.id)
+    if after_id is not None:
+        stmt = stmt.where(Game.id > after_id)
+    return db.session.execute(stmt).all()
+
+
+def _encode(rows, teams):
+    index = {team: i for i, team in enumerate(teams)}
+    for _, _, home, visitor, _, _ in rows:
+        for team in (home, visitor):
+            if team not in index:
+                index[team] = len(teams)
+                teams.append(team)
+
+    return {
+        'id': np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows)),
+        'date': np.fromiter(((r[1] - EPOCH).days for r in rows), dtype=np.int64, count=len(rows)),
+        'home': np.fromiter((index[r[2]] for r in rows), dtype=np.int16, count=len(rows)),
+        'visitor': np.fromiter((index[r[3]] for r in rows), dtype=np.int16, count=len(rows)),
+        'home_score': np.fromiter((r[4] for r in rows), dtype=np.int16, count=len(rows)),
+        'visitor_score': np.fromiter((r[5] for r in rows), dtype=np.int16, count=len(rows)),
+    }
+
+
+def _feature_games(columns, order):
+    """The games in `order` in the shape the features module takes."""
+    return pd.DataFrame({
+        'day': columns['date'][order],
+        'home': columns['home'][order],
+        'visitor': columns['visitor'][order],
+        'home_score': columns['home_score'][order],
+        'visitor_score': columns['visitor_score'][order],
+    })
+
+
+def _add_form(columns, history=None):
+    """
+    Adds the form column for the rows of `columns`, which come after the
+    chronological `history` games (a frame, or None for none at all).
+    """
+    order = np.argsort(columns['date'], kind='stable')
+    games = _feature_games(columns, order)
+    if history is None:
+        features = form_features(games)
+    else:
+        features = extend_form_features(history[form_tail(history)], games)
+    columns[FORM_COLUMN] = np.empty_like(features)
+    columns[FORM_COLUMN][order] = features
+
+
+def _write_columns(archive_dir, generation, start, columns):
+    for name, values in columns.items():
+        path = _path(archive_dir, name, generation)
+        row_size = np.dtype(values.dtype).itemsize * int(np.prod(values.shape[1:]))
+        with open(path, 'ab') as f:
+            # Drop whatever a crashed append left past the committed rows.
+            f.truncate(start * row_size)
+            f.write(np.ascontiguousarray(values).tobytes())
+
+
+def _rebuild(archive_dir, old_meta):
+    generation = (old_meta['generation'] + 1) if old_meta else 0
+    teams = []
+    columns = _encode(_fetch_rows(), teams)
+    _add_form(columns)
+    _write_columns(archive_dir, generation, 0, columns)
+
+    meta = {
+        'version': ARCHIVE_VERSION,
+        'form_version': FORM_VERSION,
+        'generation': generation,
+        'count': len(columns['id']),
+        'last_id': int(columns['id'].max()) if len(columns['id']) else 0,
+        'sorted': bool(np.all(np.diff(columns['date']) >= 0)),
+        'teams': teams,
+        'fingerprint': _archive_fingerprint(columns),
+    }
+    _write_meta(archive_dir, meta)
+
+    if old_meta:
+        _remove_generations(archive_dir, keep={generation, old_meta['generation']})
+    return meta
+
+
+def _remove_generations(archive_dir, keep):
+    for path in glob.glob(os.path.join(archive_dir, '*.*.bin')):
+        generation = os.path.basename(path).rsplit('.', 2)[1]
+        if generation.isdigit() and int(generation) not in keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # still mapped by a reader on Windows; the next rebuild retries
+
+
+def _append(archive_dir, meta, rows):
+    """
+    Appends rows past the archive's last id. Returns the new metadata, or
+    None when a game predates the latest archived one: its form features
+    would change those of later games, so only a rebuild can add it.
+    """
+    teams = list(meta['teams'])
+    columns = _encode(rows, teams)
+
+    archived = _open_columns(archive_dir, meta)
+    history = None
+    if meta['count']:
+        if int(columns['date'].min()) < int(archived['date'].max()):
+            return None
+        order = np.arange(meta['count']) if meta['sorted'] else np.argsort(archived['date'], kind='stable')
+        history = _feature_games(archived, order)
+    _add_form(columns, history)
+    _write_columns(archive_dir, meta['generation'], meta['count'], columns)
+
+    current = _open_columns(archive_dir, dict(meta, count=meta['count'] + len(rows)))
+    appended_sorted = bool(np.all(np.diff(columns['date']) >= 0))
+
+    meta = dict(
+        meta,
+        count=meta['count'] + len(rows),
+        last_id=int(columns['id'].max()),
+        sorted=meta['sorted'] and appended_sorted,
+        teams=teams,
+        fingerprint=_archive_fingerprint(current),
+    )
+    _write_meta(archive_dir, meta)
+    return meta
+
+
+def _current_meta(archive_dir, fingerprint):
+    meta = _read_meta(archive_dir)
+    if meta is not None and meta['fingerprint'] == fingerprint:
+        return meta
+    return None
+
+
+def update_archive():
+    """
+    Brings the archive in line with the Game table: appends the games added
+    since the last export, or rewrites it when the table changed otherwise.
+    Returns the archive metadata, or None when GAME_ARCHIVE_DIR is unset.
+    An archive that is already current is returned without taking the lock.
+    """
+    archive_dir = _archive_dir()
+    if not archive_dir:
+        return None
+    fingerprint = current_fingerprint()
+    meta = _current_meta(archive_dir, fingerprint)
+    if meta is not None:
+        return meta
+    os.makedirs(archive_dir, exist_ok=True)
+
+    with _archive_lock(archive_dir):
+        # Another process may have brought it up to date while we waited.
+        meta = _read_meta(archive_dir)
+        if meta is not None and meta['fingerprint'] == fingerprint:
+            return meta
+
+        if meta is not None:
+            rows = _fetch_rows(after_id=meta['last_id'])
+            appended = _append(archive_dir, meta, rows) if rows else meta
+            if appended is not None:
+                meta = appended
+                if meta['fingerprint'] == fingerprint:
+                    return meta
+
+        return _rebuild(archive_dir, meta)
+
+
+def load_games_frame():
+    """
+    The game history as _load_games_frame() returns it, read from the
+    archive. Scores come straight from the mapped files, teams are
+    categoricals over the archive's team codes and the FORM_FEATURES
+    columns are the stored ones. Returns None when GAME_ARCHIVE_DIR is unset.
+
+    The importers update the archive after they commit, so a read normally
+    only checks meta.json against current_fingerprint() and maps the files,
+    with no lock; an archive that is behind is caught up first.
+    """
+    archive_dir = _archive_dir()
+    if not archive_dir:
+        return None
+    meta = _current_meta(archive_dir, current_fingerprint()) or update_archive()
+
+    columns = _open_columns(archive_dir, meta)
+    if not meta['sorted']:
+        order = np.argsort(columns['date'], kind='stable')
+        columns = {name: values[order] for name, values in columns.items()}
+
+    teams = meta['teams']
+    df = pd.DataFrame({
+        'date': pd.Series(columns['date'].view('datetime64[D]')).astype('datetime64[s]'),
+        'team1': pd.Categorical.from_codes(columns['home'], categories=teams),
+        'team2': pd.Categorical.from_codes(columns['visitor'], categories=teams),
+        'score1': pd.Series(columns['home_score'], copy=False),
+        'score2': pd.Series(columns['visitor_score'], copy=False),
+    }, copy=False)
+    df['team1_win'] = (df['score1'] > df['score2']).astype(int)
+    df[FORM_FEATURES] = columns[FORM_COLUMN]
+    return df
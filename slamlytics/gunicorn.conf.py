@@ -0,0 +1,49 @@
+"""
+gunicorn settings for serving the app on every core:
+
+    cd slamlytics
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is created in the master (preload_app) and wsgi.warm_up() loads
+the trained models there before any worker is forked, so the workers
+share them instead of each holding its own copy of the RandomForest.
+
+Publishing a new model version sends the master SIGHUP (see
+model_registry.build_artifact): on_reload loads the new models in the
+master, fresh workers are forked from it and the old ones finish their
+in-flight requests before exiting. `kill -HUP <master pid>` does the same
+by hand.
+"""
+import multiprocessing
+import os
+
+# create_app() then leaves its background threads to post_fork below.
+os.environ['SLAMLYTICS_PREFORK'] = '1'
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+preload_app = True
+timeout = 60
+graceful_timeout = 30
+# Recycled workers are forked from the warmed-up master, so this is cheap.
+max_requests = 2000
+max_requests_jitter = 200
+
+
+def when_ready(server):
+    from wsgi import warm_up
+
+    models = warm_up(server.app.wsgi())
+    server.log.info("Preloaded models: %s", models['fingerprint'] if models else "none trained yet")
+
+
+def on_reload(server):
+    when_ready(server)
+
+
+def post_fork(server, worker):
+    from app import start_background_jobs
+
+    app = server.app.wsgi()
+    app.config['MODEL_RELOAD_PID'] = server.pid
+    start_background_jobs(app)
@@ -1,68 +1,218 @@
 import os
 import requests
-from app.models import Game, db
+from app.models import Game, SyncState, db
+from app.metrics import stage
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from sqlalchemy import select, update
+from sqlalchemy.dialects.sqlite import insert
+from urllib3.util.retry import Retry
+from prediction_results import reopen_predictions, settle_predictions
 
 load_dotenv()
 
 API_URL = "https://api.balldontlie.io/v1/games"
 API_KEY = os.getenv("BALLDONTLIE_API_KEY")
-print("API_KEY:", API_KEY)
 
-def import_last_30_games():
+SYNC_SOURCE = "balldontlie"
+IMPORT_DAYS = 150
+OVERLAP_DAYS = 3
+PER_PAGE = 100
+CHUNK_DAYS = 15
+MAX_WORKERS = 4
+INSERT_CHUNK = 500
+REQUEST_TIMEOUT = (5, 30)
+
+def make_session(pool_size=MAX_WORKERS):
+    """A requests session whose connection pool is shared by all fetch workers."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Authorization"] = f"Bearer {API_KEY}"
+    return session
+
+def date_chunks(start, end, days=CHUNK_DAYS):
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=days - 1), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+def fetch_chunk(session, start, end, api_url=API_URL):
+    """Every game between start and end, following meta.next_cursor page by page."""
+    rows = []
+    cursor = None
+    while True:
+        params = {
+            "start_date": start.strftime("%Y-%m-%d"),
+            "end_date": end.strftime("%Y-%m-%d"),
+            "per_page": PER_PAGE,
+        }
+        if cursor is not None:
+            params["cursor"] = cursor
+
+        response = session.get(api_url, params=params, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        payload = response.json()
+        rows.extend(payload.get("data", []))
+
+        cursor = (payload.get("meta") or {}).get("next_cursor")
+        if not cursor:
+            return rows
+
+def fetch_games(start, end, api_url=API_URL, workers=MAX_WORKERS):
+    """
+    Splits [start, end] into date chunks and pages through them concurrently;
+    pages within a chunk stay sequential since each cursor comes from the
+    previous page.
+    """
+    session = make_session(workers)
     try:
-        print("Importing last 30 games")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            chunks = pool.map(lambda chunk: fetch_chunk(session, *chunk, api_url=api_url), date_chunks(start, end))
+            return [row for rows in chunks for row in rows]
+    finally:
+        session.close()
 
-        today = datetime.today().date()
-        three_months_ago = today - timedelta(days=150)
-
-        headers = {"Authorization": f"Bearer {API_KEY}"}
-        response = requests.get(
-            API_URL,
-            params={
-                "start_date": three_months_ago.strftime("%Y-%m-%d"),
-                "end_date": today.strftime("%Y-%m-%d"),
-                "per_page": 100,
-            },
-            headers=headers
+def _game_values(row):
+    return {
+        "game_id": str(row.get("id")),
+        "home_team": row["home_team"]["abbreviation"],
+        "visitor_team": row["visitor_team"]["abbreviation"],
+        "home_score": int(row.get("home_team_score", 0)),
+        "visitor_score": int(row.get("visitor_team_score", 0)),
+        "date": datetime.strptime(row.get("date", "")[:10], "%Y-%m-%d").date(),
+    }
+
+def _advance_watermark(state, values):
+    if not values:
+        return
+    latest = max(values, key=lambda game: (game["date"], int(game["game_id"])))
+    if state.last_game_date is None or latest["date"] >= state.last_game_date:
+        state.last_game_date = latest["date"]
+        state.last_game_id = latest["game_id"]
+
+def insert_games(rows):
+    """
+    Bulk inserts game value dicts, skipping game_ids that already exist,
+    and returns the inserted Game rows.
+    """
+    new_games = []
+    statement = insert(Game).on_conflict_do_nothing(index_elements=["game_id"]).returning(Game)
+    for start in range(0, len(rows), INSERT_CHUNK):
+        new_games.extend(db.session.scalars(statement, rows[start:start + INSERT_CHUNK]))
+    return new_games
+
+def store_games(data):
+    """
+    Inserts the finished games that aren't stored yet and applies score
+    corrections to stored ones. Returns (new Game rows, corrected Game rows).
+    Existing games in the fetched date range are loaded in one query; the
+    insert ignores conflicts, so a concurrent sync can't make it fail.
+    """
+    values = {}
+    for row in data:
+        if row.get("status") == "Final":
+            game = _game_values(row)
+            values[game["game_id"]] = game
+    if not values:
+        return [], []
+
+    dates = [game["date"] for game in values.values()]
+    existing = {
+        game_id: (pk, scores)
+        for game_id, pk, *scores in db.session.execute(
+            select(Game.game_id, Game.id, Game.home_score, Game.visitor_score)
+            .where(Game.date.between(min(dates), max(dates)))
         )
-        response.raise_for_status()
-        data = response.json().get("data", [])
-
-        data.sort(key=lambda g: g["date"], reverse=True)
-
-        added = 0
-        for row in data:
-            if row.get("status") != "Final":
-                continue
-
-            game_id = str(row.get("id"))
-            date_str = row.get("date", "")[:10]
-            game_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-
-            home_team = row["home_team"]["abbreviation"]
-            visitor_team = row["visitor_team"]["abbreviation"]
-            home_score = row.get("home_team_score", 0)
-            visitor_score = row.get("visitor_team_score", 0)
-
-            exists = Game.query.filter_by(game_id=game_id).first()
-            if exists:
-                continue
-
-            game = Game(
-                game_id=game_id,
-                home_team=home_team,
-                visitor_team=visitor_team,
-                home_score=int(home_score),
-                visitor_score=int(visitor_score),
-                date=game_date
-            )
-            db.session.add(game)
-            added += 1
-
-        db.session.commit()
-        print(f"Import is complete, added new {added} games.")
+    }
+
+    rows = []
+    corrections = []
+    for game_id, game in values.items():
+        if game_id not in existing:
+            rows.append(game)
+            continue
+        pk, scores = existing[game_id]
+        if scores != [game["home_score"], game["visitor_score"]]:
+            corrections.append({"id": pk, "home_score": game["home_score"], "visitor_score": game["visitor_score"]})
 
+    new_games = insert_games(rows)
+
+    corrected = []
+    if corrections:
+        db.session.execute(update(Game), corrections)
+        corrected = Game.query.filter(Game.id.in_([c["id"] for c in corrections])).all()
+    return new_games, corrected
+
+def sync_games(api_url=API_URL, workers=MAX_WORKERS):
+    """
+    Fetches the games since the sync watermark, going OVERLAP_DAYS back so
+    late score corrections are picked up (the last IMPORT_DAYS days on the
+    first run), and stores them. Returns the number of new games, or None
+    if the sync failed.
+    """
+    from game_archive import mark_games_changed, update_archive
+    from ml_models import rebuild_ratings, update_ratings
+    from model_registry import refresh_models
+
+    try:
+        state = db.session.get(SyncState, SYNC_SOURCE)
+        if state is None:
+            state = SyncState(source=SYNC_SOURCE)
+            db.session.add(state)
+        today = datetime.today().date()
+        if state.last_game_date:
+            start = state.last_game_date - timedelta(days=OVERLAP_DAYS)
+        else:
+            start = today - timedelta(days=IMPORT_DAYS)
+        print(f"Syncing games since {start}")
+
+        with stage('import_games.fetch'):
+            data = fetch_games(start, today, api_url, workers)
+
+        with stage('import_games.insert'):
+            new_games, corrected = store_games(data)
+
+        added = len(new_games)
+        if added or corrected:
+            mark_games_changed(SYNC_SOURCE)
+        with stage('import_games.ratings'):
+            if corrected:
+                rebuild_ratings()
+            else:
+                update_ratings(new_games)
+
+        _advance_watermark(state, [_game_values(row) for row in data if row.get("status") == "Final"])
+        state.last_synced_at = datetime.now()
+        with stage('import_games.commit'):
+            db.session.commit()
+        print(f"Sync is complete, added {added} new games, corrected {len(corrected)}.")
+
+        with stage('import_games.settle'):
+            reopen_predictions([g.id for g in corrected])
+            settled = settle_predictions((g.home_team, g.visitor_team) for g in new_games + corrected)
+            db.session.commit()
+        if settled:
+            print(f"Settled {settled} predictions.")
+
+        if added or corrected:
+            refresh_models()
     except Exception as e:
+        db.session.rollback()
         print("Error getting data:", e)
+        return None
+
+    # The archive is a cache rebuilt from the Game table, so a failure here
+    # is logged and the next sync catches it up.
+    try:
+        with stage('import_games.archive'):
+            update_archive()
+    except Exception as e:
+        print("Error updating the game archive:", e)
+    return added
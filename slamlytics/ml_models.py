@@ -1,97 +1,272 @@
+import importlib
+import time
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, roc_auc_score
-from app.models import Game
+from scipy import sparse
+from sqlalchemy import select, String, type_coerce
+from app import db
+from app.metrics import stage
+from app.models import Game, TeamRating
+from features import FORM_FEATURES, TeamForm, form_features
+from game_archive import load_games_frame
+
+MAX_TEAMS = 30
+GAME_COLUMNS = ['date', 'team1', 'team2', 'score1', 'score2']
+
+DEFAULT_WEIGHTING = 'team_rank'
+MAX_RECENCY_WEIGHT = 2.0
+HALF_LIFE_DAYS = 90
+
+ELO_INITIAL = 1500.0
+ELO_K = 20.0
+ELO_HOME_ADVANTAGE = 100.0
+# Between seasons a team keeps this share of its distance from the mean.
+ELO_SEASON_CARRYOVER = 0.75
+ELO_SEASON_GAP_DAYS = 90
+
+def _load_games_frame():
+    """
+    Loads the game history column-wise: from the memory-mapped archive when
+    GAME_ARCHIVE_DIR is set, otherwise with a single Core SELECT instead of
+    materializing a Game ORM object (and a dict) per row. Either way every
+    game comes with its pregame FORM_FEATURES (see features); the archive
+    keeps them stored and extends them as games are appended. The archive
+    is only a cache, so when it can't be read the table is queried instead.
+    """
+    try:
+        df = load_games_frame()
+    except Exception as e:
+        print(f"Error reading the game archive, loading games from the database: {e}")
+        df = None
+    if df is not None:
+        return df
+
+    stmt = select(
+        type_coerce(Game.date, String),
+        Game.home_team,
+        Game.visitor_team,
+        Game.home_score,
+        Game.visitor_score,
+    ).order_by(Game.date)
+    rows = db.session.execute(stmt).all()
+
+    df = pd.DataFrame.from_records(rows, columns=GAME_COLUMNS)
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+    df['team1_win'] = (df['score1'] > df['score2']).astype(int)
+
+    codes, _ = pd.factorize(pd.concat([df['team1'], df['team2']], ignore_index=True))
+    df[FORM_FEATURES] = form_features(_feature_games(df, codes[:len(df)], codes[len(df):]))
+    return df
+
+def _feature_games(df, home_codes, visitor_codes):
+    """The games of a date-ordered frame in the shape the features module takes."""
+    return pd.DataFrame({
+        'day': df['date'].values.astype('datetime64[D]').astype(np.int64),
+        'home': home_codes,
+        'visitor': visitor_codes,
+        'home_score': df['score1'].values,
+        'visitor_score': df['score2'].values,
+    })
+
+def current_form(teams, df=None):
+    """
+    TeamForm of `teams` (in that order) after the latest game, which
+    matchup_matrix() needs to describe games that haven't been played.
+    """
+    df = _load_games_frame() if df is None else df
+    home_ids, visitor_ids = encode_teams(df['team1'], df['team2'], teams)
+    return TeamForm.from_games(_feature_games(df, home_ids, visitor_ids), len(teams))
 
 def _prepare_dataframe():
-    games = Game.query.order_by(Game.date).all()
-    if not games:
-        return pd.DataFrame(), pd.Series(dtype=int), []
-
-    rows = []
-    for g in games:
-        winner = 1 if g.home_score > g.visitor_score else 0
-        rows.append({
-            'date': g.date,
-            'team1': g.home_team,
-            'team2': g.visitor_team,
-            'score1': g.home_score,
-            'score2': g.visitor_score,
-            'team1_win': winner
-        })
-
-    df = pd.DataFrame(rows)
-    df = df.sort_values('date')
+    df = _load_games_frame()
+    if df.empty:
+        return pd.DataFrame(), pd.Series(dtype=int), [], df
+
     df['margin'] = df['score1'] - df['score2']
 
-    top_teams = pd.concat([df['team1'], df['team2']]).value_counts().nlargest(30).index
-    df = df[df['team1'].isin(top_teams) & df['team2'].isin(top_teams)].copy()
+    counts = pd.concat([df['team1'], df['team2']]).value_counts()
+    top_teams = counts[counts > 0].nlargest(MAX_TEAMS).index
+    keep = df['team1'].isin(top_teams) & df['team2'].isin(top_teams)
+    if not keep.all():
+        df = df[keep].reset_index(drop=True)
 
-    for team in top_teams:
-        df[team] = ((df['team1'] == team) | (df['team2'] == team)).astype(int)
+    teams = list(top_teams)
+    df['team1_id'], df['team2_id'] = encode_teams(df['team1'], df['team2'], teams)
 
     y = df['team1_win']
-    X = df[top_teams]
+    X = sparse.hstack([
+        team_design_matrix(df['team1_id'].values, df['team2_id'].values, len(teams)),
+        sparse.csr_matrix(df[FORM_FEATURES].to_numpy(dtype=np.float64)),
+    ], format='csr')
 
-    return X, y, list(top_teams), df
+    return X, y, teams, df
 
-import numpy as np
+def encode_teams(home_teams, visitor_teams, teams):
+    """
+    Interns team codes to their position in `teams`; unknown codes become -1.
+    """
+    home_ids = pd.Categorical(home_teams, categories=teams).codes
+    visitor_ids = pd.Categorical(visitor_teams, categories=teams).codes
+    return home_ids, visitor_ids
 
-def train_models(return_models=False):
-    X, y, teams, df = _prepare_dataframe()
+def team_design_matrix(home_ids, visitor_ids, n_teams):
+    """
+    Builds the sparse game x team matrix: +1 in the home team's column and
+    -1 in the visitor's, so the models can tell the two sides apart.
+    Ids of -1 (teams unknown to the model) are left out.
+    """
+    home_ids = np.asarray(home_ids)
+    visitor_ids = np.asarray(visitor_ids)
+    rows = np.arange(len(home_ids))
 
-    if isinstance(X, pd.DataFrame) and X.empty:
-        return {'error': 'No data'}, None, None
+    cols = np.concatenate([home_ids, visitor_ids])
+    data = np.concatenate([np.ones(len(home_ids), dtype=np.int8), np.full(len(visitor_ids), -1, dtype=np.int8)])
+    known = cols >= 0
 
-    if len(y) < 50:
-        return {'error': 'Not enough games to train (need at least ~50).'}, None, None
+    return sparse.csr_matrix(
+        (data[known], (np.concatenate([rows, rows])[known], cols[known])),
+        shape=(len(home_ids), n_teams),
+        dtype=np.int8,
+    )
 
-    df = df.sort_values('date')
-    df['weight'] = 1.0
-    max_weight = 2.0
+def matchup_matrix(home_ids, visitor_ids, n_teams, form, as_of=None):
+    """
+    The model input for matchups played on the date as_of (default today):
+    the team design matrix followed by FORM_FEATURES from the TeamForm.
+    """
+    return sparse.hstack([
+        team_design_matrix(home_ids, visitor_ids, n_teams),
+        sparse.csr_matrix(form.pair_features(home_ids, visitor_ids, as_of)),
+    ], format='csr')
 
-    for team in teams:
-        team_games_idx = df[(df['team1'] == team) | (df['team2'] == team)].index
-        n = len(team_games_idx)
-        if n > 0:
-            exp_weights = np.exp(np.linspace(0, np.log(max_weight), n))
-            df.loc[team_games_idx, 'weight'] = exp_weights
+def team_rank_weights(df, max_weight=MAX_RECENCY_WEIGHT):
+    """
+    Each team's games are weighted from 1 (its oldest) up to max_weight (its
+    newest) on an exponential curve over the team's own game rank by date
+    (games on the same day share their average rank). A game gets the mean
+    of its two teams' weights, so the result depends neither on the order
+    teams are processed in nor on the row order.
+    """
+    n = len(df)
+    if n == 0:
+        return np.ones(0)
+
+    long = pd.DataFrame({
+        'team': np.concatenate([df['team1_id'].values, df['team2_id'].values]),
+        'date': np.tile(df['date'].values, 2),
+    })
+    grouped = long.groupby('team')['date']
+    rank = grouped.rank(method='average').values - 1
+    count = grouped.transform('size').values
+
+    fraction = np.divide(rank, count - 1, out=np.zeros(len(rank)), where=count > 1)
+    team_weights = max_weight ** fraction
+    return team_weights.reshape(2, n).mean(axis=0)
+
+def half_life_weights(df, half_life_days=HALF_LIFE_DAYS):
+    """
+    Exponential decay by calendar age: a game half_life_days older than the
+    latest one counts half as much.
+    """
+    if len(df) == 0:
+        return np.ones(0)
+    age_days = (df['date'].max() - df['date']).dt.days.values
+    return 0.5 ** (age_days / half_life_days)
+
+def uniform_weights(df):
+    return np.ones(len(df))
+
+WEIGHTING_STRATEGIES = {
+    'team_rank': team_rank_weights,
+    'half_life': half_life_weights,
+    'uniform': uniform_weights,
+}
+
+def recency_weights(df, weighting=DEFAULT_WEIGHTING):
+    """
+    Sample weights for the date-ordered games in df. `weighting` is a key of
+    WEIGHTING_STRATEGIES or any callable taking the frame.
+    """
+    strategy = weighting if callable(weighting) else WEIGHTING_STRATEGIES[weighting]
+    return np.asarray(strategy(df), dtype=float)
+
+# Estimators are named by import path so scikit-learn is only loaded to train;
+# serving scores the compact artifacts from model_artifacts.
+MODEL_PARAMS = {
+    'lr': ('sklearn.linear_model.LogisticRegression', {'max_iter': 1000}),
+    'rf': ('sklearn.ensemble.RandomForestClassifier', {'n_estimators': 200, 'random_state': 42}),
+    # Features are binned into at most 255 histogram bins once, and boosting
+    # stops when the loss on a held-out 10% hasn't improved for 10 rounds.
+    'hgb': ('sklearn.ensemble.HistGradientBoostingClassifier', {
+        'max_iter': 300,
+        'learning_rate': 0.1,
+        'early_stopping': True,
+        'validation_fraction': 0.1,
+        'n_iter_no_change': 10,
+        'random_state': 42,
+    }),
+}
+# Engines that only take a dense feature matrix.
+DENSE_MODELS = {'hgb'}
+
+def make_model(name):
+    class_path, params = MODEL_PARAMS[name]
+    module_name, class_name = class_path.rsplit('.', 1)
+    model_class = getattr(importlib.import_module(module_name), class_name)
+    return model_class(**params)
+
+def model_input(name, X):
+    """X in the form the engine `name` fits and predicts on."""
+    if name in DENSE_MODELS and sparse.issparse(X):
+        return X.toarray()
+    return X
+
+def train_models(return_models=False, weighting=DEFAULT_WEIGHTING):
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    with stage('train_models.load'):
+        X, y, teams, df = _prepare_dataframe()
 
-    sample_weights = df['weight'].values
+    if len(y) == 0:
+        return {'error': 'No data'}, None, None, None
+
+    if len(y) < 50:
+        return {'error': 'Not enough games to train (need at least ~50).'}, None, None, None
+
+    with stage('train_models.weights'):
+        sample_weights = recency_weights(df, weighting)
 
     X_train, X_test, y_train, y_test, w_train, w_test = train_test_split(
         X, y, sample_weights, test_size=0.2, random_state=42, stratify=y
     )
 
-    lr = LogisticRegression(max_iter=1000)
-    lr.fit(X_train, y_train, sample_weight=w_train)
-    y_pred_lr = lr.predict(X_test)
-    y_prob_lr = lr.predict_proba(X_test)[:, 1]
-
-    rf = RandomForestClassifier(n_estimators=200, random_state=42)
-    rf.fit(X_train, y_train, sample_weight=w_train)
-    y_pred_rf = rf.predict(X_test)
-    y_prob_rf = rf.predict_proba(X_test)[:, 1]
-
-    results = {
-        'lr_accuracy': float(accuracy_score(y_test, y_pred_lr)),
-        'lr_auc': float(roc_auc_score(y_test, y_prob_lr)),
-        'rf_accuracy': float(accuracy_score(y_test, y_pred_rf)),
-        'rf_auc': float(roc_auc_score(y_test, y_prob_rf)),
-        'n_train': int(len(y_train)),
-        'n_test': int(len(y_test))
-    }
+    results = {}
+    models = {}
+    for name in MODEL_PARAMS:
+        start = time.perf_counter()
+        with stage(f'train_models.fit_{name}'):
+            model = make_model(name)
+            model.fit(model_input(name, X_train), y_train, sample_weight=w_train)
+        results[f'{name}_fit_seconds'] = round(time.perf_counter() - start, 3)
+        X_eval = model_input(name, X_test)
+        results[f'{name}_accuracy'] = float(accuracy_score(y_test, model.predict(X_eval)))
+        results[f'{name}_auc'] = float(roc_auc_score(y_test, model.predict_proba(X_eval)[:, 1]))
+        models[name] = model
+    lr, rf, hgb = models['lr'], models['rf'], models['hgb']
+
+    results['hgb_iterations'] = int(hgb.n_iter_)
+    results['n_train'] = int(len(y_train))
+    results['n_test'] = int(len(y_test))
 
     try:
+        feature_names = teams + FORM_FEATURES
         coef = {}
         if X.shape[1] <= 1000:
             coef_vals = lr.coef_[0]
-            coef_df = pd.Series(coef_vals, index=X.columns).abs().sort_values(ascending=False).head(10)
+            coef_df = pd.Series(coef_vals, index=feature_names).abs().sort_values(ascending=False).head(10)
             coef = coef_df.to_dict()
-        rf_importances = pd.Series(rf.feature_importances_, index=X.columns).sort_values(ascending=False).head(10).to_dict()
+        rf_importances = pd.Series(rf.feature_importances_, index=feature_names).sort_values(ascending=False).head(10).to_dict()
         results['lr_top_features'] = {k: float(v) for k, v in coef.items()}
         results['rf_top_features'] = {k: float(v) for k, v in rf_importances.items()}
     except Exception:
@@ -108,35 +283,170 @@ def train_models(return_models=False):
 
     top3_teams = sorted(team_scores.items(), key=lambda x: x[1], reverse=True)[:3]
     results['top3_teams'] = [{'team': t, 'win_prob': float(w)} for t, w in top3_teams]
+    results['teams'] = teams
 
     if return_models:
-        return results, lr, rf
-    return results, None, None
+        return results, lr, rf, hgb
+    return results, None, None, None
 
-def predict_match(team1_code, team2_code, lr_model=None, rf_model=None):
-    X, y, teams, df = _prepare_dataframe()
+def predict_matches(pairs, lr_model=None, rf_model=None, teams=None, form=None, as_of=None, hgb_model=None):
+    """
+    Scores a list of (home, visitor) team code pairs, played on the date
+    as_of (default today), with one feature matrix and a single
+    predict_proba call per model. Returns one dict of probabilities per
+    pair, in order. Without `form` (the TeamForm the models were trained
+    with) the current form is computed from the game history.
+    """
+    if teams is None:
+        X, y, teams, df = _prepare_dataframe()
 
-    if isinstance(X, pd.DataFrame) and X.empty:
-        return {'error': 'No data'}
+    if not teams:
+        return [{'error': 'No data'} for _ in pairs]
+    if form is None:
+        form = current_form(teams)
 
-    base = pd.DataFrame(columns=X.columns)
-    base.loc[0] = 0
+    pairs = list(pairs)
+    home_ids, visitor_ids = encode_teams([p[0] for p in pairs], [p[1] for p in pairs], teams)
+    X = matchup_matrix(home_ids, visitor_ids, len(teams), form, as_of)
 
-    if team1_code in base.columns:
-        base.loc[0, team1_code] = 1
-    if team2_code in base.columns:
-        base.loc[0, team2_code] = 1
-
-    probs = {}
-    if lr_model is not None:
-        try:
-            probs['lr_prob_team1_win'] = float(lr_model.predict_proba(base)[0, 1])
-        except Exception:
-            probs['lr_prob_team1_win'] = None
-    if rf_model is not None:
+    columns = {}
+    for name, model in (('lr', lr_model), ('rf', rf_model), ('hgb', hgb_model)):
+        if model is None:
+            continue
         try:
-            probs['rf_prob_team1_win'] = float(rf_model.predict_proba(base)[0, 1])
+            columns[f'{name}_prob_team1_win'] = model.predict_proba(model_input(name, X))[:, 1].tolist() if pairs else []
         except Exception:
-            probs['rf_prob_team1_win'] = None
+            columns[f'{name}_prob_team1_win'] = [None] * len(pairs)
+
+    return [{key: values[i] for key, values in columns.items()} for i in range(len(pairs))]
+
+def predict_match(team1_code, team2_code, lr_model=None, rf_model=None, teams=None, form=None, as_of=None,
+                  hgb_model=None):
+    return predict_matches([(team1_code, team2_code)], lr_model, rf_model, teams, form, as_of, hgb_model)[0]
+
+def probability_matrix(model, n_teams, form, as_of=None):
+    """
+    P(home team i beats visitor j) for every ordered pair of the model's
+    teams meeting on the date as_of (default today), from a single batched
+    predict_proba call. The diagonal is NaN.
+    """
+    home_ids, visitor_ids = np.nonzero(~np.eye(n_teams, dtype=bool))
+    # n_teams^2 rows: dense is cheap and every engine takes it.
+    X = matchup_matrix(home_ids, visitor_ids, n_teams, form, as_of).toarray()
+
+    matrix = np.full((n_teams, n_teams), np.nan)
+    matrix[home_ids, visitor_ids] = model.predict_proba(X)[:, 1]
+    return matrix
+
+def elo_probability(home_rating, visitor_rating, home_advantage=ELO_HOME_ADVANTAGE):
+    return 1.0 / (1.0 + 10 ** ((visitor_rating - home_rating - home_advantage) / 400.0))
+
+def elo_update(home_rating, visitor_rating, home_score, visitor_score,
+               k=ELO_K, home_advantage=ELO_HOME_ADVANTAGE):
+    """
+    New (home, visitor) ratings after one game. The step is scaled by the
+    margin of victory, damped when the favourite wins (FiveThirtyEight's
+    NBA Elo multiplier), so blowouts by strong teams do not inflate ratings.
+    """
+    expected = elo_probability(home_rating, visitor_rating, home_advantage)
+    home_won = home_score > visitor_score
 
-    return probs
+    margin = abs(home_score - visitor_score)
+    winner_edge = home_rating + home_advantage - visitor_rating
+    if not home_won:
+        winner_edge = -winner_edge
+    multiplier = ((margin + 3) ** 0.8) / (7.5 + 0.006 * winner_edge)
+
+    shift = k * multiplier * ((1.0 if home_won else 0.0) - expected)
+    return home_rating + shift, visitor_rating - shift
+
+def _replay_elo(state, games):
+    """
+    Applies date-ordered (date, home, visitor, home_score, visitor_score)
+    games to state, a dict of team -> [rating, games, last_game_date].
+    Returns the pre-game home-win probability of every game.
+    """
+    pregame = []
+    for game_date, home, visitor, home_score, visitor_score in games:
+        for team in (home, visitor):
+            entry = state.setdefault(team, [ELO_INITIAL, 0, None])
+            if entry[2] is not None and (game_date - entry[2]).days > ELO_SEASON_GAP_DAYS:
+                entry[0] = ELO_SEASON_CARRYOVER * entry[0] + (1 - ELO_SEASON_CARRYOVER) * ELO_INITIAL
+            entry[1] += 1
+            entry[2] = game_date
+
+        pregame.append(elo_probability(state[home][0], state[visitor][0]))
+        state[home][0], state[visitor][0] = elo_update(
+            state[home][0], state[visitor][0], home_score, visitor_score
+        )
+    return pregame
+
+def _store_ratings(state, rows=None):
+    rows = rows if rows is not None else {}
+    for team, (rating, games, last_game_date) in state.items():
+        row = rows.get(team)
+        if row is None:
+            row = TeamRating(team=team)
+            db.session.add(row)
+        row.rating = float(rating)
+        row.games = int(games)
+        row.last_game_date = last_game_date
+
+def elo_pregame_probabilities(df):
+    """
+    Elo home-win probability of each game in the date-ordered frame, using
+    only the games before it. Leak-free, so backtests can slice it.
+    """
+    return np.array(_replay_elo({}, zip(
+        df['date'].dt.date, df['team1'], df['team2'],
+        df['score1'].astype(int), df['score2'].astype(int),
+    )))
+
+def rebuild_ratings():
+    """
+    Recomputes every team's Elo rating by replaying the whole Game history.
+    Only needed when the table is empty or games arrive out of order.
+    The caller commits.
+    """
+    df = _load_games_frame()
+    state = {}
+    _replay_elo(state, zip(
+        df['date'].dt.date, df['team1'], df['team2'],
+        df['score1'].astype(int), df['score2'].astype(int),
+    ))
+
+    TeamRating.query.delete()
+    _store_ratings(state)
+
+def update_ratings(new_games):
+    """
+    Folds newly imported Game rows into the stored ratings in O(1) per game,
+    in the caller's transaction (the caller commits). Falls back to
+    rebuild_ratings() when there are no ratings yet or a new game predates
+    the latest rated one.
+    """
+    new_games = sorted(new_games, key=lambda g: g.date)
+    if not new_games:
+        return
+
+    rows = {row.team: row for row in TeamRating.query.all()}
+    latest = max((row.last_game_date for row in rows.values() if row.last_game_date), default=None)
+    if latest is None or new_games[0].date < latest:
+        rebuild_ratings()
+        return
+
+    state = {team: [row.rating, row.games, row.last_game_date] for team, row in rows.items()}
+    _replay_elo(state, (
+        (g.date, g.home_team, g.visitor_team, g.home_score, g.visitor_score) for g in new_games
+    ))
+    _store_ratings(state, rows)
+
+def elo_match_probability(home_team, visitor_team):
+    ratings = dict(
+        db.session.query(TeamRating.team, TeamRating.rating)
+        .filter(TeamRating.team.in_([home_team, visitor_team]))
+        .all()
+    )
+    if home_team not in ratings or visitor_team not in ratings:
+        return None
+    return float(elo_probability(ratings[home_team], ratings[visitor_team]))
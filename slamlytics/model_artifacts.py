@@ -0,0 +1,293 @@
+"""
+Compact on-disk format for trained models.
+
+An artifact is a directory holding header.json and one .npy file per
+array. The header carries the data fingerprint, the training results and
+the feature schema (the team order of the design matrix columns and the
+form features after them), plus each team's TeamForm and the as_of date
+its probability matrices were computed for, so a loaded artifact can
+score matchups without the database or _prepare_dataframe.
+Arrays are opened with mmap_mode='r': loading only reads the header, and
+every worker process shares the same page-cached model data instead of
+unpickling its own copy of the estimators.
+
+Logistic regression is kept as its coefficient vector and intercept. A
+random forest is flattened into node arrays over all trees; leaf values
+hold each leaf's home-win share, as predict_proba would compute it.
+Gradient boosting uses the same node arrays, with leaf values adding up
+to the log-odds of a home win.
+"""
+import datetime
+import json
+import os
+import shutil
+
+import numpy as np
+
+from features import FORM_FEATURES, FORM_VERSION, TeamForm
+
+FORMAT_VERSION = 2
+HEADER = 'header.json'
+# +1 in the home team's column, -1 in the visitor's, then FORM_FEATURES.
+FEATURE_ENCODING = 'team_form_v1'
+
+
+class LinearModel:
+    """Logistic regression reduced to predict_proba over the feature matrix."""
+
+    def __init__(self, coef, intercept):
+        self.coef = coef
+        self.intercept = intercept
+
+    @classmethod
+    def from_estimator(cls, lr):
+        # Binary LogisticRegression keeps one row, for classes_[1] (a home win).
+        return cls(np.asarray(lr.coef_[0], dtype=np.float64), float(lr.intercept_[0]))
+
+    def predict_proba(self, X):
+        p = 1.0 / (1.0 + np.exp(-(X @ self.coef + self.intercept)))
+        p = np.asarray(p, dtype=np.float64).ravel()
+        return np.column_stack([1.0 - p, p])
+
+
+class _TreeEnsemble:
+    """
+    Trees as flat node arrays: roots[t] is the first node of tree t,
+    left/right are global node indices (-1 at leaves) and value is what
+    each leaf contributes to a prediction.
+    """
+
+    ARRAYS = ('roots', 'left', 'right', 'feature', 'threshold', 'value')
+
+    def __init__(self, roots, left, right, feature, threshold, value):
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+
+    @staticmethod
+    def _flatten(trees):
+        """
+        Concatenates (left, right, feature, threshold, value, is_leaf) node
+        arrays of single trees into the ARRAYS of the ensemble.
+        """
+        roots, left, right, feature, threshold, value = [], [], [], [], [], []
+        offset = 0
+        for tree_left, tree_right, tree_feature, tree_threshold, tree_value, is_leaf in trees:
+            roots.append(offset)
+            left.append(np.where(is_leaf, -1, tree_left + offset))
+            right.append(np.where(is_leaf, -1, tree_right + offset))
+            # Leaves get feature 0 so the vectorized lookup stays in bounds.
+            feature.append(np.where(is_leaf, 0, tree_feature))
+            threshold.append(tree_threshold)
+            value.append(tree_value)
+            offset += len(is_leaf)
+
+        return (
+            np.asarray(roots, dtype=np.int32),
+            np.concatenate(left).astype(np.int32),
+            np.concatenate(right).astype(np.int32),
+            np.concatenate(feature).astype(np.int32),
+            np.concatenate(threshold).astype(np.float64),
+            np.concatenate(value).astype(np.float64),
+        )
+
+    def _leaf_values(self, X):
+        """value of the leaf each row reaches in each tree, as (rows, trees)."""
+        n_rows, n_trees = X.shape[0], len(self.roots)
+        node = np.tile(self.roots, n_rows)
+        row = np.repeat(np.arange(n_rows), n_trees)
+
+        # Walk all (row, tree) pairs down together, dropping those at a leaf.
+        active = np.arange(node.size)
+        while active.size:
+            current = node[active]
+            left = self.left[current]
+            internal = left >= 0
+            active, current, left = active[internal], current[internal], left[internal]
+            go_left = X[row[active], self.feature[current]] <= self.threshold[current]
+            node[active] = np.where(go_left, left, self.right[current])
+
+        return self.value[node].reshape(n_rows, n_trees)
+
+
+class ForestModel(_TreeEnsemble):
+    """A random forest; leaf values are home-win probabilities."""
+
+    @classmethod
+    def from_estimator(cls, rf):
+        positive = list(rf.classes_).index(1)
+        trees = []
+        for estimator in rf.estimators_:
+            tree = estimator.tree_
+            counts = tree.value[:, 0, :]
+            trees.append((
+                tree.children_left, tree.children_right, tree.feature, tree.threshold,
+                counts[:, positive] / counts.sum(axis=1), tree.children_left < 0,
+            ))
+        return cls(*cls._flatten(trees))
+
+    def predict_proba(self, X):
+        # sklearn's trees compare float32 features against the thresholds.
+        X = X.toarray() if hasattr(X, 'toarray') else np.asarray(X)
+        X = X.astype(np.float32)
+        p = self._leaf_values(X).mean(axis=1) if len(self.roots) else np.zeros(X.shape[0])
+        return np.column_stack([1.0 - p, p])
+
+
+class BoostedModel(_TreeEnsemble):
+    """
+    HistGradientBoostingClassifier: leaf values are log-odds increments on
+    top of baseline, the log-odds of a home win before the first tree.
+    """
+
+    def __init__(self, roots, left, right, feature, threshold, value, baseline=0.0):
+        super().__init__(roots, left, right, feature, threshold, value)
+        self.baseline = baseline
+
+    @classmethod
+    def from_estimator(cls, hgb):
+        # A binary classifier grows one tree per iteration, scoring classes_[1].
+        # The feature matrices have no missing values, so each split is just
+        # `value <= num_threshold` and missing_go_to_left isn't kept.
+        sign = 1.0 if hgb.classes_[1] == 1 else -1.0
+        trees = []
+        for (predictor,) in hgb._predictors:
+            nodes = predictor.nodes
+            trees.append((
+                nodes['left'], nodes['right'], nodes['feature_idx'], nodes['num_threshold'],
+                sign * nodes['value'], nodes['is_leaf'].astype(bool),
+            ))
+        baseline = sign * float(np.ravel(hgb._baseline_prediction)[0])
+        return cls(*cls._flatten(trees), baseline=baseline)
+
+    def predict_proba(self, X):
+        X = X.toarray() if hasattr(X, 'toarray') else np.asarray(X)
+        X = X.astype(np.float64)
+        p = 1.0 / (1.0 + np.exp(-(self.baseline + self._leaf_values(X).sum(axis=1))))
+        return np.column_stack([1.0 - p, p])
+
+
+def compact(artifact):
+    """
+    Replaces the fitted sklearn estimators of an artifact dict with their
+    LinearModel / ForestModel / BoostedModel equivalents.
+    """
+    artifact = dict(artifact)
+    if artifact.get('lr') is not None:
+        artifact['lr'] = LinearModel.from_estimator(artifact['lr'])
+    if artifact.get('rf') is not None:
+        artifact['rf'] = ForestModel.from_estimator(artifact['rf'])
+    if artifact.get('hgb') is not None:
+        artifact['hgb'] = BoostedModel.from_estimator(artifact['hgb'])
+    return artifact
+
+
+def write_artifact(path, artifact):
+    """
+    Writes a compacted artifact dict to the directory `path`. The files go
+    to a temporary sibling directory first, which is then renamed into
+    place, so readers never see a partial artifact.
+    """
+    parent, name = os.path.split(path)
+    tmp_path = os.path.join(parent, f".{name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    arrays = {}
+    header = {
+        'format': FORMAT_VERSION,
+        'fingerprint': artifact['fingerprint'],
+        'trained_at': artifact.get('trained_at'),
+        'train_seconds': artifact.get('train_seconds'),
+        'as_of': artifact['as_of'].isoformat() if artifact.get('as_of') else None,
+        'results': artifact['results'],
+        'schema': {
+            'encoding': FEATURE_ENCODING,
+            'teams': list(artifact['teams']),
+            'form_features': FORM_FEATURES,
+            'form_version': FORM_VERSION,
+        },
+        'models': {},
+    }
+
+    form = artifact.get('form')
+    if form is not None:
+        arrays['form_values'] = form.values
+        arrays['form_last_day'] = form.last_day
+        header['form'] = True
+
+    lr, rf, hgb = artifact.get('lr'), artifact.get('rf'), artifact.get('hgb')
+    if lr is not None:
+        arrays['lr_coef'] = lr.coef
+        header['models']['lr'] = {'type': 'linear', 'intercept': lr.intercept}
+    if rf is not None:
+        for name in ForestModel.ARRAYS:
+            arrays[f'rf_{name}'] = getattr(rf, name)
+        header['models']['rf'] = {'type': 'forest'}
+    if hgb is not None:
+        for name in BoostedModel.ARRAYS:
+            arrays[f'hgb_{name}'] = getattr(hgb, name)
+        header['models']['hgb'] = {'type': 'boosted', 'baseline': hgb.baseline}
+    for name, matrix in artifact.get('matrices', {}).items():
+        arrays[f'matrix_{name}'] = matrix
+    header['matrices'] = sorted(artifact.get('matrices', {}))
+
+    for name, values in arrays.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(values))
+    with open(os.path.join(tmp_path, HEADER), 'w') as f:
+        json.dump(header, f)
+
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # Another worker already wrote the artifact for this fingerprint.
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+
+
+def read_artifact(path):
+    """
+    Opens the artifact directory at `path` and returns the artifact dict
+    get_models() serves, with its arrays memory-mapped. Returns None when
+    there is no readable artifact of this format.
+    """
+    try:
+        with open(os.path.join(path, HEADER)) as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    schema = header.get('schema', {})
+    if (header.get('format') != FORMAT_VERSION or schema.get('encoding') != FEATURE_ENCODING
+            or schema.get('form_version') != FORM_VERSION):
+        return None
+
+    def array(name):
+        # asarray drops the memmap subclass (and its per-index overhead), not the mapping.
+        return np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+
+    models = header['models']
+    lr = rf = hgb = None
+    if 'lr' in models:
+        lr = LinearModel(array('lr_coef'), models['lr']['intercept'])
+    if 'rf' in models:
+        rf = ForestModel(*(array(f'rf_{name}') for name in ForestModel.ARRAYS))
+    if 'hgb' in models:
+        hgb = BoostedModel(*(array(f'hgb_{name}') for name in BoostedModel.ARRAYS), baseline=models['hgb']['baseline'])
+
+    return {
+        'fingerprint': header['fingerprint'],
+        'results': header['results'],
+        'lr': lr,
+        'rf': rf,
+        'hgb': hgb,
+        'teams': schema['teams'],
+        'form': TeamForm(array('form_values'), array('form_last_day')) if header.get('form') else None,
+        'matrices': {name: array(f'matrix_{name}') for name in header['matrices']},
+        'trained_at': header.get('trained_at'),
+        'train_seconds': header.get('train_seconds'),
+        'as_of': datetime.date.fromisoformat(header['as_of']) if header.get('as_of') else None,
+    }
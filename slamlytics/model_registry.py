@@ -0,0 +1,251 @@
+import glob
+import os
+import shutil
+import signal
+import threading
+import time
+from datetime import date, datetime
+
+from flask import current_app
+
+from app import db
+from app.metrics import stage
+from app.models import TeamRating
+from file_locks import file_lock
+from game_archive import current_fingerprint
+from ml_models import train_models, current_form, probability_matrix, rebuild_ratings, DEFAULT_WEIGHTING
+from model_artifacts import compact, read_artifact, write_artifact
+from training_jobs import submit_training
+
+# Bump when the feature schema changes so stale artifacts are not reused.
+ARTIFACT_VERSION = 6
+KEEP_ARTIFACTS = 3
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def _weighting():
+    return current_app.config.get('MODEL_WEIGHTING', DEFAULT_WEIGHTING)
+
+
+def _artifact_path(fingerprint):
+    name = f"models-v{ARTIFACT_VERSION}-{_weighting()}-{fingerprint}"
+    return os.path.join(current_app.config['MODEL_DIR'], name)
+
+
+def _latest_artifact_path():
+    pattern = os.path.join(current_app.config['MODEL_DIR'], f"models-v{ARTIFACT_VERSION}-{_weighting()}-*")
+    paths = glob.glob(pattern)
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def _load_artifact(path):
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        return read_artifact(path)
+    except Exception as e:
+        print(f"Error loading model artifact {path}: {e}")
+        return None
+
+
+def _save_artifact(artifact):
+    model_dir = current_app.config['MODEL_DIR']
+    os.makedirs(model_dir, exist_ok=True)
+
+    write_artifact(_artifact_path(artifact['fingerprint']), artifact)
+
+    # Also sweeps up pickled artifacts from before ARTIFACT_VERSION 4.
+    old_artifacts = sorted(glob.glob(os.path.join(model_dir, 'models-*')), key=os.path.getmtime)
+    for old_path in old_artifacts[:-KEEP_ARTIFACTS]:
+        if os.path.isdir(old_path):
+            shutil.rmtree(old_path, ignore_errors=True)
+        else:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
+def _build_lock():
+    """Serializes training across the worker processes sharing MODEL_DIR."""
+    return file_lock(os.path.join(current_app.config['MODEL_DIR'], '.build.lock'))
+
+
+def _notify_published():
+    """
+    Asks the pre-fork master (see gunicorn.conf.py) to reload its workers
+    gracefully, so they are all forked again with the new models loaded.
+    """
+    pid = current_app.config.get('MODEL_RELOAD_PID')
+    if pid:
+        os.kill(pid, signal.SIGHUP)
+
+
+def build_artifact():
+    """
+    Trains the models on the current Game data, precomputes their
+    probability matrices and writes the compacted artifact (see
+    model_artifacts) to MODEL_DIR. This is what the background training
+    worker runs. It also seeds the Elo ratings table on first use. Failed
+    trainings (e.g. too few games) are stored too, so they are not retried
+    until the data changes.
+
+    When several worker processes ask for the same data, the first one
+    trains and publishes; the others wait for it and load its artifact.
+    """
+    fingerprint = current_fingerprint()
+    with _build_lock():
+        artifact = _load_artifact(_artifact_path(fingerprint))
+        if artifact is not None:
+            return artifact
+        artifact = _train_artifact(fingerprint)
+
+    _notify_published()
+    return artifact
+
+
+def _train_artifact(fingerprint):
+    start = time.perf_counter()
+
+    if TeamRating.query.first() is None:
+        rebuild_ratings()
+        db.session.commit()
+
+    results, lr_model, rf_model, hgb_model = train_models(return_models=True, weighting=_weighting())
+    artifact = {
+        'fingerprint': fingerprint,
+        'results': results,
+        'lr': lr_model,
+        'rf': rf_model,
+        'hgb': hgb_model,
+        'teams': results.get('teams', []),
+        'form': None,
+        'matrices': {},
+        'as_of': date.today(),
+    }
+    if lr_model is not None:
+        n_teams = len(artifact['teams'])
+        form = artifact['form'] = current_form(artifact['teams'])
+        as_of = artifact['as_of']
+        with stage('build_artifact.matrices'):
+            artifact['matrices'] = {
+                'lr': probability_matrix(lr_model, n_teams, form, as_of),
+                'rf': probability_matrix(rf_model, n_teams, form, as_of),
+                'hgb': probability_matrix(hgb_model, n_teams, form, as_of),
+            }
+
+    artifact['trained_at'] = datetime.now().isoformat(timespec='seconds')
+    artifact['train_seconds'] = round(time.perf_counter() - start, 3)
+    artifact = compact(artifact)
+    with stage('build_artifact.save'):
+        _save_artifact(artifact)
+    return artifact
+
+
+def _activate(artifact):
+    _loaded.clear()
+    _loaded.update(artifact)
+    _loaded['team_index'] = {team: i for i, team in enumerate(artifact['teams'])}
+
+
+def _drop_loaded(artifact):
+    with _lock:
+        _loaded.clear()
+
+
+def _empty_artifact():
+    return {
+        'fingerprint': None,
+        'results': {'error': 'The model is being trained, please check back in a moment.'},
+        'lr': None,
+        'rf': None,
+        'hgb': None,
+        'teams': [],
+        'form': None,
+        'matrices': {},
+        'as_of': None,
+        'team_index': {},
+    }
+
+
+def get_models():
+    """
+    Returns the newest trained model artifact as a dict with 'fingerprint',
+    'results', 'lr', 'rf', 'hgb', 'teams' (the feature column order), 'form'
+    (the TeamForm after the latest trained-on game), 'matrices', the
+    home x visitor win probabilities of each model, and 'as_of', the day
+    those were computed for. 'lr', 'rf' and 'hgb' are the compact
+    model_artifacts scorers, which predict_matches() accepts like the
+    sklearn estimators; pass it as_of to get the matrices' probabilities.
+
+    Artifacts are loaded once per process, with their arrays memory-mapped.
+    Training never happens on the calling thread: if the Game data changed
+    since the last artifact was built, a background job is queued and the
+    last completed model is returned until it finishes ('fingerprint' is
+    None if there is none yet). The data is identified by
+    current_fingerprint(), so this does not scan the Game table.
+    """
+    fingerprint = current_fingerprint()
+
+    with _lock:
+        if _loaded.get('fingerprint') == fingerprint:
+            return dict(_loaded)
+
+        artifact = _load_artifact(_artifact_path(fingerprint))
+        if artifact is not None:
+            _activate(artifact)
+            return dict(_loaded)
+
+    submit_training(fingerprint, on_done=_drop_loaded)
+
+    with _lock:
+        if not _loaded:
+            artifact = _load_artifact(_latest_artifact_path())
+            if artifact is not None:
+                _activate(artifact)
+        return dict(_loaded) if _loaded else _empty_artifact()
+
+
+def preload_models():
+    """
+    Loads the artifact for the current data, or else the newest one, into
+    this process without queueing a training run, so it is safe to call in
+    a pre-fork master. Returns the artifact, or None if there is none yet.
+    """
+    fingerprint = current_fingerprint()
+
+    with _lock:
+        artifact = _load_artifact(_artifact_path(fingerprint)) or _load_artifact(_latest_artifact_path())
+        if artifact is None:
+            return None
+        _activate(artifact)
+        return dict(_loaded)
+
+
+def refresh_models():
+    """
+    Called by the importers after they add games: queues a background
+    rebuild of the models (and their probability matrices) for the new
+    data right away instead of on the next request. Returns the job Future.
+    """
+    return submit_training(current_fingerprint(), on_done=_drop_loaded)
+
+
+def match_probabilities(home_team, visitor_team):
+    """
+    Looks up each model's home-win probability for a matchup in the
+    precomputed matrices. Teams the models were not trained on give None.
+    """
+    models = get_models()
+    home_id = models['team_index'].get(home_team)
+    visitor_id = models['team_index'].get(visitor_team)
+
+    probs = {}
+    for name, matrix in models['matrices'].items():
+        if home_id is None or visitor_id is None or home_id == visitor_id:
+            probs[f'{name}_prob_team1_win'] = None
+        else:
+            probs[f'{name}_prob_team1_win'] = float(matrix[home_id, visitor_id])
+    return probs
@@ -0,0 +1,197 @@
+import math
+
+from sqlalchemy import Integer, cast, desc, func, select, tuple_, update
+
+from app import db
+from app.models import Game, ModelStat, Prediction, User
+
+PREDICTION_MODELS = ('lr', 'rf', 'hgb', 'elo')
+SCORED_MODELS = ('lr', 'rf')
+LOG_LOSS_EPS = 1e-6
+MATCHUP_CHUNK = 500
+
+
+def _first_game_id():
+    """
+    Correlated subquery: id of the earliest game with the prediction's
+    matchup played on or after the day it was made.
+    """
+    return (
+        select(Game.id)
+        .where(
+            Game.home_team == Prediction.home_team,
+            Game.visitor_team == Prediction.visitor_team,
+            Game.date >= func.date(Prediction.created_at),
+        )
+        .order_by(Game.date)
+        .limit(1)
+        .correlate(Prediction)
+        .scalar_subquery()
+    )
+
+
+def _outcome(home_team, visitor_team, probs, home_score, visitor_score):
+    """The outcome columns of a prediction: actual winner, per-model hit and log-loss."""
+    home_won = home_score > visitor_score
+    values = {'actual_winner': home_team if home_won else visitor_team}
+    for name, prob in probs.items():
+        if prob is None:
+            continue
+        p = prob if home_won else 1 - prob
+        values[f'{name}_hit'] = (prob >= 0.5) == home_won
+        values[f'{name}_log_loss'] = -math.log(min(max(p, LOG_LOSS_EPS), 1 - LOG_LOSS_EPS))
+    return values
+
+
+def _contributions(probs, hits):
+    """What one settled prediction adds to each model's tp/fp/score."""
+    stats = {name: {'tp': 0, 'fp': 0, 'score': 0} for name in SCORED_MODELS}
+    for name in SCORED_MODELS:
+        if hits.get(name) is not None:
+            stats[name]['tp' if hits[name] else 'fp'] += 1
+
+    lr_prob, rf_prob = probs['lr'], probs['rf']
+    if lr_prob is not None and rf_prob is not None:
+        lr_hit, rf_hit = hits['lr'], hits['rf']
+        if lr_hit and rf_hit:
+            winner = 'lr' if lr_prob > rf_prob else 'rf'
+        elif lr_hit or rf_hit:
+            winner = 'lr' if lr_hit else 'rf'
+        else:
+            winner = 'lr' if abs(lr_prob - 0.5) < abs(rf_prob - 0.5) else 'rf'
+        stats[winner]['score'] += 1
+    return stats
+
+
+def _apply(stats, sign=1):
+    for name, delta in stats.items():
+        if not any(delta.values()):
+            continue
+        values = {column: getattr(ModelStat, column) + sign * delta[column] for column in delta}
+        result = db.session.execute(update(ModelStat).where(ModelStat.model == name).values(**values))
+        if result.rowcount == 0:
+            db.session.add(ModelStat(model=name, **{column: sign * delta[column] for column in delta}))
+            db.session.flush()
+
+
+def _pending_query():
+    """Pending predictions joined to the game that settles them."""
+    return (
+        select(
+            Prediction.id, Prediction.home_team, Prediction.visitor_team,
+            Prediction.lr_prob_team1_win, Prediction.rf_prob_team1_win, Prediction.hgb_prob_team1_win,
+            Prediction.elo_prob_team1_win,
+            Game.id, Game.home_score, Game.visitor_score,
+        )
+        .join(Game, Game.id == _first_game_id())
+        .where(Prediction.resolved_game_id.is_(None))
+    )
+
+
+def _pending_rows(matchups):
+    query = _pending_query()
+    if matchups is None:
+        return db.session.execute(query).all()
+
+    rows = []
+    for start in range(0, len(matchups), MATCHUP_CHUNK):
+        chunk = matchups[start:start + MATCHUP_CHUNK]
+        pair = tuple_(Prediction.home_team, Prediction.visitor_team)
+        rows.extend(db.session.execute(query.where(pair.in_(chunk))).all())
+    return rows
+
+
+def settle_predictions(matchups=None):
+    """
+    Settles pending predictions whose game has been played: stamps the game,
+    actual winner, per-model hit and log-loss on the prediction and folds it
+    into the ModelStat totals. matchups limits the work to predictions on
+    those (home_team, visitor_team) pairs, e.g. the ones just imported.
+    Doesn't commit. Returns the number of predictions settled.
+    """
+    if matchups is not None:
+        matchups = list(set(matchups))
+        if not matchups:
+            return 0
+
+    settled = 0
+    for pred_id, home, visitor, lr_prob, rf_prob, hgb_prob, elo_prob, game_id, home_score, visitor_score \
+            in _pending_rows(matchups):
+        probs = {'lr': lr_prob, 'rf': rf_prob, 'hgb': hgb_prob, 'elo': elo_prob}
+        outcome = _outcome(home, visitor, probs, home_score, visitor_score)
+
+        # The guard on resolved_game_id keeps a concurrent settle from counting a prediction twice.
+        claimed = db.session.execute(
+            update(Prediction)
+            .where(Prediction.id == pred_id, Prediction.resolved_game_id.is_(None))
+            .values(resolved_game_id=game_id, **outcome)
+        ).rowcount
+        if not claimed:
+            continue
+        hits = {name: outcome.get(f'{name}_hit') for name in SCORED_MODELS}
+        _apply(_contributions(probs, hits))
+        settled += 1
+    return settled
+
+
+def unsettle_prediction(pred):
+    """Takes a settled prediction back out of the totals, e.g. before deleting it."""
+    if pred.resolved_game_id is None:
+        return
+    probs = {'lr': pred.lr_prob_team1_win, 'rf': pred.rf_prob_team1_win}
+    _apply(_contributions(probs, {'lr': pred.lr_hit, 'rf': pred.rf_hit}), sign=-1)
+
+
+def reopen_predictions(game_ids):
+    """
+    Puts the predictions settled against these games back to pending and
+    takes them out of the totals, e.g. after a score correction. Doesn't
+    commit. Returns the number of predictions reopened.
+    """
+    if not game_ids:
+        return 0
+    preds = Prediction.query.filter(Prediction.resolved_game_id.in_(game_ids)).all()
+    for pred in preds:
+        unsettle_prediction(pred)
+        pred.resolved_game_id = None
+        pred.actual_winner = None
+        for name in PREDICTION_MODELS:
+            setattr(pred, f'{name}_hit', None)
+            setattr(pred, f'{name}_log_loss', None)
+    db.session.flush()
+    return len(preds)
+
+
+def model_stats():
+    """The chart data: ({model: {'TP', 'FP'}}, {model: score}) for the scored models."""
+    rows = {stat.model: stat for stat in ModelStat.query.all()}
+    metrics, scores = {}, {}
+    for name in SCORED_MODELS:
+        stat = rows.get(name)
+        metrics[name] = {"TP": stat.tp if stat else 0, "FP": stat.fp if stat else 0}
+        scores[name] = stat.score if stat else 0
+    return metrics, scores
+
+
+def user_leaderboard():
+    """
+    Per user with at least one settled prediction: settled/total counts and
+    each model's accuracy and mean log-loss over the settled ones, best LR
+    accuracy first.
+    """
+    columns = [
+        User.username,
+        func.count(Prediction.id).label('total'),
+        func.count(Prediction.resolved_game_id).label('settled'),
+    ]
+    for name in PREDICTION_MODELS:
+        columns.append(func.avg(cast(getattr(Prediction, f'{name}_hit'), Integer)).label(f'{name}_accuracy'))
+        columns.append(func.avg(getattr(Prediction, f'{name}_log_loss')).label(f'{name}_log_loss'))
+
+    return db.session.execute(
+        select(*columns)
+        .join(Prediction, Prediction.user_id == User.id)
+        .group_by(User.id, User.username)
+        .having(func.count(Prediction.resolved_game_id) > 0)
+        .order_by(desc('lr_accuracy'), desc('settled'))
+    ).mappings().all()
@@ -0,0 +1,198 @@
+"""
+Monte Carlo simulation of the rest of a season from a pairwise home-win
+probability matrix (see model_registry / ml_models.probability_matrix).
+
+Every batch draws one array of uniforms for all (simulation, game) cells
+and turns it into win totals with a single matrix product, so there is no
+Python loop over games; batches keep memory bounded.
+
+Run from the slamlytics directory:
+    python simulation.py --schedule remaining.csv --model lr --sims 10000
+where remaining.csv has home_team,visitor_team columns.
+"""
+import argparse
+import time
+
+import numpy as np
+
+EAST = {
+    "ATL", "BOS", "BKN", "CHA", "CHI", "CLE", "DET", "IND",
+    "MIA", "MIL", "NYK", "ORL", "PHI", "TOR", "WAS",
+}
+WEST = {
+    "DAL", "DEN", "GSW", "HOU", "LAC", "LAL", "MEM", "MIN",
+    "NOP", "OKC", "PHX", "POR", "SAC", "SAS", "UTA",
+}
+CONFERENCES = {'East': EAST, 'West': WEST}
+
+DIRECT_PLAYOFF_SEEDS = 6
+PLAY_IN_SEEDS = 10
+DEFAULT_BATCH_SIZE = 2_000
+
+
+def _conference_groups(teams, conferences):
+    groups = {}
+    for i, team in enumerate(teams):
+        name = next((conf for conf, members in conferences.items() if team in members), 'Other')
+        groups.setdefault(name, []).append(i)
+    return {name: np.array(ids) for name, ids in groups.items()}
+
+
+def simulate_season(prob_matrix, teams, home_ids, visitor_ids, current_wins=None,
+                    n_sims=10_000, batch_size=DEFAULT_BATCH_SIZE, seed=None,
+                    conferences=CONFERENCES):
+    """
+    Simulates the remaining games (home_ids[k] hosts visitor_ids[k], indices
+    into teams) n_sims times and returns, per team, projected wins (mean,
+    10th and 90th percentile), expected conference seed, and the odds of a
+    top-6 seed, a play-in seed (7-10) and a top-8 finish.
+    """
+    n_teams = len(teams)
+    home_ids = np.asarray(home_ids, dtype=np.intp)
+    visitor_ids = np.asarray(visitor_ids, dtype=np.intp)
+    n_games = len(home_ids)
+
+    home_probs = np.asarray(prob_matrix, dtype=np.float32)[home_ids, visitor_ids]
+    if np.isnan(home_probs).any():
+        raise ValueError("The schedule contains matchups without a probability.")
+
+    # wins = home_won @ (H - V) + column sums of V, with H/V the game x team
+    # indicators of the home and visitor sides.
+    incidence = np.zeros((n_games, n_teams), dtype=np.float32)
+    incidence[np.arange(n_games), home_ids] += 1
+    incidence[np.arange(n_games), visitor_ids] -= 1
+    base_wins = np.bincount(visitor_ids, minlength=n_teams).astype(np.float32)
+    if current_wins is not None:
+        base_wins += np.asarray(current_wins, dtype=np.float32)
+
+    max_wins = int(base_wins.max()) + n_games + 1
+    win_hist = np.zeros(n_teams * max_wins, dtype=np.int64)
+    groups = _conference_groups(teams, conferences)
+    max_seed = max(len(ids) for ids in groups.values())
+    seed_hist = np.zeros(n_teams * (max_seed + 1), dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    team_offsets = np.arange(n_teams) * max_wins
+
+    for start in range(0, n_sims, batch_size):
+        size = min(batch_size, n_sims - start)
+        home_won = (rng.random((size, n_games), dtype=np.float32) < home_probs).astype(np.float32)
+        wins = np.rint(home_won @ incidence + base_wins).astype(np.int64)
+
+        win_hist += np.bincount((wins + team_offsets).ravel(), minlength=win_hist.size)
+
+        # Random fractions break ties between teams with equal records.
+        ranking = wins + rng.random((size, n_teams))
+        for ids in groups.values():
+            order = np.argsort(-ranking[:, ids], axis=1)
+            seeds = np.empty_like(order)
+            np.put_along_axis(seeds, order, np.arange(1, len(ids) + 1), axis=1)
+            flat = (ids * (max_seed + 1) + seeds).ravel()
+            seed_hist += np.bincount(flat, minlength=seed_hist.size)
+
+    win_hist = win_hist.reshape(n_teams, max_wins)
+    seed_hist = seed_hist.reshape(n_teams, max_seed + 1)
+    win_values = np.arange(max_wins)
+    seed_values = np.arange(max_seed + 1)
+
+    projections = {}
+    for i, team in enumerate(teams):
+        cdf = np.cumsum(win_hist[i]) / n_sims
+        seed_odds = seed_hist[i] / n_sims
+        projections[team] = {
+            'mean_wins': float(win_hist[i] @ win_values / n_sims),
+            'wins_p10': int(np.searchsorted(cdf, 0.10)),
+            'wins_p90': int(np.searchsorted(cdf, 0.90)),
+            'expected_seed': float(seed_odds @ seed_values),
+            'top6_odds': float(seed_odds[1:DIRECT_PLAYOFF_SEEDS + 1].sum()),
+            'play_in_odds': float(seed_odds[DIRECT_PLAYOFF_SEEDS + 1:PLAY_IN_SEEDS + 1].sum()),
+            'top8_odds': float(seed_odds[1:9].sum()),
+        }
+    return projections
+
+
+def elo_probability_matrix(ratings):
+    """Pairwise home-win probabilities from an array of Elo ratings."""
+    from ml_models import elo_probability
+
+    ratings = np.asarray(ratings, dtype=float)
+    matrix = elo_probability(ratings[:, None], ratings[None, :])
+    np.fill_diagonal(matrix, np.nan)
+    return matrix
+
+
+def current_season_wins(teams, season_start):
+    """Wins per team (in teams order) from Game rows on or after season_start."""
+    from ml_models import _load_games_frame
+
+    df = _load_games_frame()
+    df = df[df['date'] >= season_start]
+    winners = np.where(df['team1_win'] == 1, df['team1'], df['team2'])
+    index = {team: i for i, team in enumerate(teams)}
+    ids = np.array([index[w] for w in winners if w in index], dtype=np.intp)
+    return np.bincount(ids, minlength=len(teams))
+
+
+def _load_model_matrix(model):
+    from app import db
+    from app.models import TeamRating
+    from model_registry import build_artifact, current_fingerprint, preload_models
+
+    if model == 'elo':
+        rows = db.session.query(TeamRating.team, TeamRating.rating).order_by(TeamRating.team).all()
+        teams = [team for team, _ in rows]
+        return teams, elo_probability_matrix([rating for _, rating in rows])
+
+    # get_models() would queue a background run and return nothing; the CLI
+    # can just wait for the models of the current data instead.
+    models = preload_models()
+    if models is None or models['fingerprint'] != current_fingerprint():
+        print("Training the models on the current data, this can take a while...")
+        models = build_artifact()
+    if model not in models['matrices']:
+        raise SystemExit(models['results'].get('error', f"No probability matrix for model {model!r}."))
+    return models['teams'], models['matrices'][model]
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of the remaining season.")
+    parser.add_argument('--schedule', required=True, help="CSV with home_team,visitor_team columns")
+    parser.add_argument('--model', default='lr', help="lr, rf, hgb or elo")
+    parser.add_argument('--season-start', default=None, help="count current wins from this date (YYYY-MM-DD)")
+    parser.add_argument('--sims', type=int, default=10_000)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        teams, matrix = _load_model_matrix(args.model)
+        current_wins = current_season_wins(teams, pd.Timestamp(args.season_start)) if args.season_start else None
+
+    index = {team: i for i, team in enumerate(teams)}
+    schedule = pd.read_csv(args.schedule)
+    unknown = set(schedule['home_team']).union(schedule['visitor_team']) - set(index)
+    if unknown:
+        raise SystemExit(f"Teams without a model probability: {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    projections = simulate_season(
+        matrix, teams,
+        schedule['home_team'].map(index).values,
+        schedule['visitor_team'].map(index).values,
+        current_wins=current_wins, n_sims=args.sims, batch_size=args.batch_size, seed=args.seed,
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"{'team':>4} {'wins':>6} {'p10-p90':>8} {'seed':>5} {'top6':>6} {'play-in':>8} {'top8':>6}")
+    for team, p in sorted(projections.items(), key=lambda item: -item[1]['mean_wins']):
+        print(f"{team:>4} {p['mean_wins']:>6.1f} {p['wins_p10']:>4}-{p['wins_p90']:<3} {p['expected_seed']:>5.1f} "
+              f"{p['top6_odds']:>6.1%} {p['play_in_odds']:>8.1%} {p['top8_odds']:>6.1%}")
+    print(f"\n{args.sims} seasons x {len(schedule)} games simulated in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from flask import current_app
+
+from background_jobs import JobFailed, JobRunner
+from file_locks import try_file_lock
+
+_runner = JobRunner('game-sync', added=None)
+_future = None
+_scheduler = None
+
+
+def _sync():
+    from import_games import sync_games
+
+    added = sync_games()
+    if added is None:
+        raise JobFailed("Sync failed, see the server log.")
+    _runner.update(added=added)
+    return added
+
+
+def submit_sync(app=None):
+    """
+    Queues a game sync on the background worker and returns its Future;
+    while one is queued or running, further requests share it.
+    """
+    global _future
+    app = app or current_app._get_current_object()
+
+    with _runner.lock:
+        if _future is None or _future.done():
+            _future = _runner.submit(app, _sync)
+        return _future
+
+
+def is_syncing():
+    with _runner.lock:
+        return _future is not None and not _future.done()
+
+
+def sync_status():
+    return _runner.status()
+
+
+def start_scheduler(app, interval_minutes):
+    """
+    Submits a sync every interval_minutes from a daemon thread. Only the
+    first call in a process starts one, and of the processes sharing
+    SYNC_LOCK_FILE (pre-fork workers) only the one holding the lock
+    submits; another takes over when that process exits.
+    """
+    global _scheduler
+
+    def loop():
+        lock = None
+        while True:
+            time.sleep(interval_minutes * 60)
+            if lock is None:
+                lock = try_file_lock(app.config['SYNC_LOCK_FILE'])
+            if lock is not None:
+                submit_sync(app)
+
+    with _runner.lock:
+        if _scheduler is not None:
+            return
+        _scheduler = threading.Thread(target=loop, name='game-sync-scheduler', daemon=True)
+        _scheduler.start()
@@ -0,0 +1,163 @@
+"""
+Fixtures shared by the tests: apps bound to a temporary SQLite database
+and a local stand-in for the balldontlie /v1/games endpoint.
+"""
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import Game  # noqa: E402
+from benchmarks.synthetic import GAMES_PER_SEASON, synthetic_games, synthetic_teams  # noqa: E402
+
+STUB_GAMES = 300
+
+
+def make_test_app(tmp_path, **config):
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'site.db'),
+        'MODEL_DIR': str(tmp_path / 'models'),
+        'GAME_ARCHIVE_DIR': str(tmp_path / 'archive'),
+        'SYNC_LOCK_FILE': str(tmp_path / 'sync.lock'),
+        'SYNC_INTERVAL_MINUTES': 0,
+        'WTF_CSRF_ENABLED': False,
+        **config,
+    })
+
+
+def synthetic_api_games(n_games, days=150, n_teams=30, seed=7, end=None):
+    """n_games finished games in the API's JSON shape, spread over the last `days` days."""
+    rng = np.random.default_rng(seed)
+    end = end or datetime.date.today()
+    teams = synthetic_teams(n_teams)
+    games = []
+    for i in range(n_games):
+        home, visitor = rng.choice(len(teams), size=2, replace=False)
+        date = end - datetime.timedelta(days=int(days * i / max(n_games, 1)))
+        games.append({
+            "id": 1_000_000 + i,
+            "date": date.isoformat(),
+            "status": "Final",
+            "home_team": {"abbreviation": teams[home]},
+            "visitor_team": {"abbreviation": teams[visitor]},
+            "home_team_score": int(rng.integers(85, 135)),
+            "visitor_team_score": int(rng.integers(85, 135)),
+        })
+    games.sort(key=lambda game: game["id"])
+    return games
+
+
+class StubGamesAPI:
+    """
+    Serves canned games filtered by start_date/end_date and paged with
+    per_page/cursor exactly like the real API (meta.next_cursor is the id
+    of the last game on the page), on a background thread. latency delays
+    every response and status makes it fail with that HTTP status instead.
+    """
+
+    def __init__(self, games, latency=0.0):
+        self.games = games
+        self.latency = latency
+        self.status = 200
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1/games"
+
+    def page(self, params):
+        start = params.get("start_date", ["0000-00-00"])[0]
+        end = params.get("end_date", ["9999-99-99"])[0]
+        per_page = min(int(params.get("per_page", ["25"])[0]), 100)
+        cursor = int(params.get("cursor", ["0"])[0])
+
+        matching = [g for g in self.games if start <= g["date"] <= end and g["id"] > cursor]
+        page = matching[:per_page]
+        meta = {"per_page": per_page}
+        if len(matching) > per_page:
+            meta["next_cursor"] = page[-1]["id"]
+        return {"data": page, "meta": meta}
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with api._lock:
+                    api.requests += 1
+                if api.latency:
+                    time.sleep(api.latency)
+                if api.status != 200:
+                    self.send_error(api.status)
+                    return
+                body = json.dumps(api.page(parse_qs(urlparse(self.path).query))).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def app(tmp_path):
+    """An app on an empty database created from the models, inside its app context."""
+    app = make_test_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+@pytest.fixture
+def season_app(app):
+    """The app with one season of synthetic games."""
+    db.session.execute(insert(Game), synthetic_games(GAMES_PER_SEASON))
+    db.session.commit()
+    return app
+
+
+@pytest.fixture
+def migrated_app(tmp_path):
+    """An app on an empty database built by the Alembic migrations."""
+    from flask_migrate import upgrade
+
+    app = make_test_app(tmp_path)
+    with app.app_context():
+        upgrade(directory=os.path.join(ROOT, 'migration'))
+    return app
+
+
+@pytest.fixture
+def api():
+    """A running StubGamesAPI with STUB_GAMES games."""
+    with StubGamesAPI(synthetic_api_games(STUB_GAMES)) as api:
+        yield api
@@ -0,0 +1,54 @@
+import datetime
+
+import pytest
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+import model_registry
+from app import db
+from app.models import Game, User
+from benchmarks.synthetic import GAMES_PER_SEASON, SEASON_DAYS, synthetic_games
+from model_registry import build_artifact, match_probabilities
+
+PASSWORD = 'Tester!234'
+
+
+class _Yesterday(datetime.date):
+    @classmethod
+    def today(cls):
+        return datetime.date.today() - datetime.timedelta(days=1)
+
+
+@pytest.fixture
+def client(app):
+    # A season that ends yesterday, so rest days differ between days.
+    start = datetime.date.today() - datetime.timedelta(days=SEASON_DAYS)
+    db.session.execute(insert(Game), synthetic_games(GAMES_PER_SEASON, start=start))
+    db.session.add(User(username='tester', password=generate_password_hash(PASSWORD, method='pbkdf2:sha256')))
+    db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'tester', 'password': PASSWORD})
+    return client
+
+
+def test_batch_api_matches_the_precomputed_matrices(client, monkeypatch):
+    # The artifact was built yesterday; the API is called today.
+    monkeypatch.setattr(model_registry, 'date', _Yesterday)
+    teams = build_artifact()['teams']
+    pairs = [[home, visitor] for home in teams[:6] for visitor in teams[:6] if home != visitor]
+
+    response = client.post('/api/predictions/batch', json={'pairs': pairs})
+    assert response.status_code == 200
+
+    for (home, visitor), entry in zip(pairs, response.get_json()['predictions']):
+        expected = match_probabilities(home, visitor)
+        for key in ('lr_prob_team1_win', 'rf_prob_team1_win', 'hgb_prob_team1_win'):
+            assert entry[key] == pytest.approx(expected[key], abs=1e-9)
+
+
+def test_batch_api_flags_unknown_teams(client):
+    teams = build_artifact()['teams']
+    response = client.post('/api/predictions/batch', json={'pairs': [[teams[0], 'XXX'], [teams[0], teams[0]]]})
+    predictions = response.get_json()['predictions']
+    assert all(entry['lr_prob_team1_win'] is None and entry['error'] for entry in predictions)
@@ -0,0 +1,46 @@
+import pytest
+
+from background_jobs import JobFailed, JobRunner
+from file_locks import try_file_lock
+
+
+def test_runner_records_the_job_fields(app):
+    runner = JobRunner('test-job', added=None)
+
+    def job():
+        assert runner.status()['state'] == 'running'
+        runner.update(added=3)
+        return 'done'
+
+    assert runner.submit(app, job, source='test').result() == 'done'
+    status = runner.status()
+    assert status['state'] == 'idle'
+    assert (status['added'], status['source'], status['error']) == (3, 'test', None)
+    assert status['finished_at'] is not None
+
+
+def test_runner_records_failures(app):
+    runner = JobRunner('test-job')
+
+    def reported():
+        raise JobFailed("Sync failed")
+
+    def crashed():
+        raise ValueError("boom")
+
+    assert runner.submit(app, reported).result() is None
+    assert runner.status()['error'] == "Sync failed"
+
+    with pytest.raises(ValueError):
+        runner.submit(app, crashed).result()
+    assert runner.status()['state'] == 'failed'
+    assert runner.status()['error'] == "boom"
+
+
+def test_only_one_process_holds_the_try_lock(tmp_path):
+    held = try_file_lock(str(tmp_path / 'locks' / 'sync.lock'))
+    assert held is not None
+    # flock locks belong to the open file, so a second open contends like another process would.
+    assert try_file_lock(str(tmp_path / 'locks' / 'sync.lock')) is None
+    held.close()
+    try_file_lock(str(tmp_path / 'locks' / 'sync.lock')).close()
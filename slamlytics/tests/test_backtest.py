@@ -0,0 +1,48 @@
+import pytest
+
+from backtest import run_backtest, walk_forward_folds
+from ml_models import _prepare_dataframe
+
+
+@pytest.mark.parametrize('n_games, kwargs', [
+    (1000, {}),
+    (1000, {'n_folds': 3, 'min_train': 100, 'test_size': 250}),
+    (1000, {'n_folds': 7, 'min_train': 300}),
+    (1000, {'n_folds': 4, 'min_train': 400, 'max_train': 200}),
+    (1003, {'n_folds': 4, 'min_train': 10, 'test_size': 1000}),
+])
+def test_folds_never_overlap_or_train_on_the_test_window(n_games, kwargs):
+    folds = walk_forward_folds(n_games, **kwargs)
+    assert folds
+
+    tested = set()
+    for train_start, train_end, test_end in folds:
+        assert 0 <= train_start < train_end < test_end <= n_games
+        test = set(range(train_end, test_end))
+        assert not tested & test
+        tested |= test
+        if kwargs.get('max_train'):
+            assert train_end - train_start <= kwargs['max_train']
+
+    # Test windows follow each other from the first one to the last game.
+    assert tested == set(range(folds[0][1], n_games))
+
+
+def test_walk_forward_folds_rejects_too_few_games():
+    with pytest.raises(ValueError):
+        walk_forward_folds(4, n_folds=5, min_train=2)
+
+
+def test_backtest_trains_only_on_earlier_dates(season_app):
+    X, y, teams, df = _prepare_dataframe()
+    dates = df['date'].reset_index(drop=True)
+    assert dates.is_monotonic_increasing
+
+    folds = run_backtest(X, y, df, engines=['lr', 'elo'], n_folds=3, workers=1)
+    bounds = walk_forward_folds(len(y), n_folds=3)
+    assert len(folds) == len(bounds)
+    for fold, (train_start, train_end, test_end) in zip(folds, bounds):
+        assert dates.iloc[train_end - 1] <= dates.iloc[train_end]
+        assert fold['test_from'] == str(dates.iloc[train_end].date())
+        assert fold['train_games'] + fold['test_games'] == test_end - train_start
+        assert set(fold['engines']) == {'lr', 'elo'}
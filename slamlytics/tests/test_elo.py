@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import insert
+
+from app import db
+from app.models import Game, TeamRating
+from benchmarks.synthetic import GAMES_PER_SEASON, synthetic_games
+from game_archive import mark_games_changed
+from ml_models import ELO_HOME_ADVANTAGE, ELO_K, elo_probability, elo_update, rebuild_ratings, update_ratings
+
+
+def _ratings():
+    return {row.team: (row.rating, row.games, row.last_game_date) for row in TeamRating.query.order_by(TeamRating.team)}
+
+
+def _add_games(rows):
+    db.session.execute(insert(Game), rows)
+    mark_games_changed('test')
+    db.session.commit()
+
+
+def _implied_multiplier(home, visitor, home_score, visitor_score):
+    new_home, _ = elo_update(home, visitor, home_score, visitor_score)
+    actual = 1.0 if home_score > visitor_score else 0.0
+    return (new_home - home) / (ELO_K * (actual - elo_probability(home, visitor)))
+
+
+def test_incremental_updates_match_a_full_replay(app):
+    # Two seasons, so the between-season carryover is crossed incrementally.
+    rows = synthetic_games(2 * GAMES_PER_SEASON)
+    split = GAMES_PER_SEASON + GAMES_PER_SEASON // 2
+    _add_games(rows[:split])
+    rebuild_ratings()
+    db.session.commit()
+
+    known = db.session.query(Game.id).count()
+    _add_games(rows[split:])
+    new_games = Game.query.filter(Game.id > known).order_by(Game.id).all()
+    for start in range(0, len(new_games), 100):
+        update_ratings(new_games[start:start + 100])
+        db.session.commit()
+    incremental = _ratings()
+
+    rebuild_ratings()
+    db.session.commit()
+    replayed = _ratings()
+
+    assert incremental.keys() == replayed.keys()
+    for team, (rating, games, last_game_date) in replayed.items():
+        assert incremental[team][0] == pytest.approx(rating, abs=1e-9)
+        assert incremental[team][1:] == (games, last_game_date)
+    assert sum(games for _, games, _ in replayed.values()) == 2 * len(rows)
+
+
+def test_update_is_zero_sum():
+    home, visitor = elo_update(1550, 1480, 101, 99)
+    assert home + visitor == pytest.approx(1550 + 1480)
+    assert home > 1550
+
+
+def test_margin_of_victory_multiplier():
+    # A home win by 10 between equal teams: the winner's edge is the home advantage.
+    assert _implied_multiplier(1500, 1500, 110, 100) == pytest.approx(13 ** 0.8 / (7.5 + 0.006 * ELO_HOME_ADVANTAGE))
+    # An away win by 10 between equal teams is an upset: the edge is negative.
+    assert _implied_multiplier(1500, 1500, 100, 110) == pytest.approx(13 ** 0.8 / (7.5 - 0.006 * ELO_HOME_ADVANTAGE))
+
+    assert _implied_multiplier(1500, 1500, 130, 100) > _implied_multiplier(1500, 1500, 110, 100)
+    # The same margin counts for less when a heavy favourite wins it.
+    assert _implied_multiplier(1700, 1400, 110, 100) < _implied_multiplier(1400, 1700, 110, 100)
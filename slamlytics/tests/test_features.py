@@ -0,0 +1,83 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import (
+    EPOCH, FORM_FEATURES, FORM_WINDOWS, REST_CAP, TeamForm, extend_form_features, form_features, form_tail,
+)
+
+N_TEAMS = 8
+
+
+def _games(n_games, seed=3):
+    """Chronological games between N_TEAMS teams, several per day."""
+    rng = np.random.default_rng(seed)
+    home = rng.integers(0, N_TEAMS, n_games)
+    visitor = (home + rng.integers(1, N_TEAMS, n_games)) % N_TEAMS
+    return pd.DataFrame({
+        'day': 20000 + np.cumsum(rng.integers(0, 2, n_games)),
+        'home': home,
+        'visitor': visitor,
+        'home_score': rng.integers(85, 135, n_games),
+        'visitor_score': rng.integers(85, 135, n_games),
+    })
+
+
+def test_features_only_use_earlier_games():
+    games = _games(400)
+    features = form_features(games)
+
+    for cut in (0, 57, 250, 399):
+        changed = games.copy()
+        rng = np.random.default_rng(cut)
+        changed.loc[cut:, 'home_score'] = rng.integers(60, 160, len(games) - cut)
+        changed.loc[cut:, 'visitor_score'] = rng.integers(60, 160, len(games) - cut)
+        np.testing.assert_array_equal(form_features(changed)[:cut + 1], features[:cut + 1])
+
+
+def test_first_games_are_neutral():
+    features = form_features(_games(400))
+    first = pd.DataFrame(features[:1], columns=FORM_FEATURES).iloc[0]
+    assert first['home_streak'] == 0 and first['visitor_margin_5'] == 0
+    assert first['home_rest_days'] == REST_CAP
+    assert first['home_home_rate'] == 0.5 and first['visitor_away_rate'] == 0.5
+
+
+@pytest.mark.parametrize('split', [1, 150, 399])
+def test_extending_from_the_tail_matches_a_full_recompute(split):
+    games = _games(400)
+    history, new_games = games[:split], games[split:].reset_index(drop=True)
+    extended = extend_form_features(history[form_tail(history)], new_games)
+    np.testing.assert_allclose(extended, form_features(games)[split:])
+
+
+def test_team_form_describes_the_next_game_like_form_features():
+    games = _games(400)
+    next_day = int(games['day'].max()) + 2
+    upcoming = pd.DataFrame({
+        'day': next_day, 'home': np.arange(N_TEAMS), 'visitor': (np.arange(N_TEAMS) + 1) % N_TEAMS,
+        'home_score': 0, 'visitor_score': 0,
+    })
+    form = TeamForm.from_games(games, N_TEAMS)
+    as_of = EPOCH + datetime.timedelta(days=next_day)
+
+    for i in range(N_TEAMS):
+        expected = form_features(pd.concat([games, upcoming[i:i + 1]], ignore_index=True))[-1]
+        actual = form.pair_features([upcoming['home'][i]], [upcoming['visitor'][i]], as_of)[0]
+        np.testing.assert_allclose(actual, expected)
+
+
+def test_unknown_team_codes_get_neutral_values():
+    form = TeamForm.from_games(_games(400), N_TEAMS)
+    as_of = EPOCH + datetime.timedelta(days=30000)
+    rows = form.pair_features([-1, 2], [3, -1], as_of)
+
+    neutral = [0.0] * (len(FORM_WINDOWS) + 1) + [REST_CAP, 0.0, 0.5]
+    width = len(neutral)
+    np.testing.assert_array_equal(rows[0, :width], neutral)
+    np.testing.assert_array_equal(rows[1, width:], neutral)
+    known = form.pair_features([2], [3], as_of)[0]
+    np.testing.assert_array_equal(rows[0, width:], known[width:])
+    np.testing.assert_array_equal(rows[1, :width], known[:width])
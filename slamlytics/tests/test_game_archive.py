@@ -0,0 +1,57 @@
+import os
+
+from sqlalchemy import insert, update
+
+import game_archive
+from app import db
+from app.models import Game
+from benchmarks.synthetic import GAMES_PER_SEASON, synthetic_games
+from game_archive import load_games_frame, mark_games_changed, update_archive
+
+
+def _no_lock(archive_dir):
+    raise AssertionError("the archive lock was taken")
+
+
+def _generation_files(app, generation):
+    archive_dir = app.config['GAME_ARCHIVE_DIR']
+    return [name for name in os.listdir(archive_dir) if name.endswith(f'.{generation}.bin')]
+
+
+def _correct_first_game():
+    db.session.execute(update(Game).where(Game.id == 1).values(home_score=Game.home_score + 1))
+    mark_games_changed('test')
+    db.session.commit()
+
+
+def test_current_archive_is_read_without_the_lock(season_app, monkeypatch):
+    update_archive()
+    monkeypatch.setattr(game_archive, '_archive_lock', _no_lock)
+
+    assert update_archive()['count'] == GAMES_PER_SEASON
+    assert len(load_games_frame()) == GAMES_PER_SEASON
+
+
+def test_stale_archive_is_caught_up_on_read(season_app):
+    update_archive()
+    rows = synthetic_games(2 * GAMES_PER_SEASON)[GAMES_PER_SEASON:]
+    db.session.execute(insert(Game), rows)
+    mark_games_changed('test')
+    db.session.commit()
+
+    df = load_games_frame()
+    assert len(df) == 2 * GAMES_PER_SEASON
+    assert df['score1'].iloc[-1] == rows[-1]['home_score']
+
+
+def test_rebuild_keeps_the_previous_generation_for_readers(season_app):
+    assert update_archive()['generation'] == 0
+
+    _correct_first_game()
+    assert update_archive()['generation'] == 1
+    assert _generation_files(season_app, 0)
+
+    _correct_first_game()
+    assert update_archive()['generation'] == 2
+    assert _generation_files(season_app, 1)
+    assert not _generation_files(season_app, 0)
@@ -0,0 +1,134 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import http_client
+from app.http_client import CachedJSONClient, CircuitBreaker, UpstreamUnavailable
+
+PARAMS = {'per_page': 30}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Only the module's own clock is faked; requests keeps real timeouts.
+    clock = Clock()
+    monkeypatch.setattr(http_client, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+
+@pytest.fixture
+def client():
+    return CachedJSONClient(ttl=10, stale_ttl=60, timeout=(0.5, 0.3), failure_threshold=2, reset_timeout=30)
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == 'closed' and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.advance(30)
+    assert breaker.state == 'half-open'
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_breaker_trial_outcome_closes_or_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.advance(30)
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+    clock.advance(30)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.failures == 0
+
+
+def test_fresh_response_is_a_cache_hit(clock, api, client):
+    first = client.get_json(api.url, PARAMS)
+    clock.advance(9)
+    assert client.get_json(api.url, PARAMS) == first
+    assert api.requests == 1
+
+    client.get_json(api.url, {'per_page': 5})
+    assert api.requests == 2
+
+
+def test_stale_response_is_served_and_refreshed(clock, api, client):
+    first = client.get_json(api.url, PARAMS)
+    clock.advance(10)
+    assert client.get_json(api.url, PARAMS) == first
+    assert _wait_for(lambda: api.requests == 2)
+    assert _wait_for(lambda: not client._refreshing)
+
+
+def test_open_circuit_serves_last_good_payload(clock, api, client):
+    first = client.get_json(api.url, PARAMS)
+    clock.advance(60)
+    api.status = 503
+
+    served = [client.get_json(api.url, PARAMS) for _ in range(5)]
+    assert all(payload == first for payload in served)
+    assert client.breaker.state == 'open'
+    # Two failed calls open the circuit; the rest never reach upstream.
+    assert api.requests == 3
+    with pytest.raises(UpstreamUnavailable):
+        client.get_json(api.url, {'per_page': 5})
+    assert api.requests == 3
+
+
+def test_circuit_recovers_through_half_open(clock, api, client):
+    api.status = 503
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailable):
+            client.get_json(api.url, PARAMS)
+    assert client.breaker.state == 'open'
+
+    clock.advance(30)
+    assert client.breaker.state == 'half-open'
+    with pytest.raises(UpstreamUnavailable):
+        client.get_json(api.url, PARAMS)
+    assert client.breaker.state == 'open'
+
+    api.status = 200
+    clock.advance(30)
+    assert client.get_json(api.url, PARAMS)['data']
+    assert client.breaker.state == 'closed'
+
+
+def test_slow_upstream_is_cut_off_by_read_timeout(clock, api, client):
+    first = client.get_json(api.url, PARAMS)
+    clock.advance(60)
+    api.latency = 1.0
+    start = time.perf_counter()
+    assert client.get_json(api.url, PARAMS) == first
+    assert time.perf_counter() - start < 0.9
@@ -0,0 +1,82 @@
+import pytest
+
+import game_archive
+import import_games
+import model_registry
+from app import db
+from game_archive import current_fingerprint, data_fingerprint
+from app.models import Game, Prediction, User
+from import_games import sync_games
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    # Several cursor pages per date chunk, and no background training runs.
+    monkeypatch.setattr(import_games, 'PER_PAGE', 10)
+    monkeypatch.setattr(model_registry, 'refresh_models', lambda: None)
+
+
+def test_sync_inserts_every_game(app, api):
+    assert sync_games(api_url=api.url, workers=4) == len(api.games)
+    assert Game.query.count() == len(api.games)
+    assert db.session.query(Game.game_id).distinct().count() == len(api.games)
+
+
+def test_sync_invalidates_the_cached_fingerprint(app, api):
+    empty = current_fingerprint()
+    sync_games(api_url=api.url, workers=4)
+    assert current_fingerprint() == data_fingerprint() != empty
+
+
+def test_resync_is_idempotent(app, api):
+    sync_games(api_url=api.url, workers=4)
+    requests = api.requests
+
+    assert sync_games(api_url=api.url, workers=4) == 0
+    assert Game.query.count() == len(api.games)
+    # Only the OVERLAP_DAYS before the watermark are fetched again.
+    assert api.requests - requests < requests
+
+
+def test_score_correction_resettles_predictions(app, api):
+    latest = max(api.games, key=lambda game: (game['date'], game['id']))
+    home, visitor = latest['home_team']['abbreviation'], latest['visitor_team']['abbreviation']
+    user = User(username='tester', password='x')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Prediction(user_id=user.id, home_team=home, visitor_team=visitor,
+                              lr_prob_team1_win=0.6, rf_prob_team1_win=0.6))
+    db.session.commit()
+
+    sync_games(api_url=api.url, workers=4)
+    home_won = latest['home_team_score'] > latest['visitor_team_score']
+    assert Prediction.query.one().actual_winner == (home if home_won else visitor)
+
+    latest['home_team_score'], latest['visitor_team_score'] = (90, 100) if home_won else (100, 90)
+    assert sync_games(api_url=api.url, workers=4) == 0
+    db.session.expire_all()
+
+    game = Game.query.filter_by(game_id=str(latest['id'])).one()
+    assert (game.home_score, game.visitor_score) == (latest['home_team_score'], latest['visitor_team_score'])
+    assert Game.query.count() == len(api.games)
+    assert Prediction.query.one().actual_winner == (visitor if home_won else home)
+
+
+def test_archive_failure_does_not_block_settlement(app, api, monkeypatch):
+    def broken_archive():
+        raise OSError('disk full')
+
+    refreshed = []
+    monkeypatch.setattr(game_archive, 'update_archive', broken_archive)
+    monkeypatch.setattr(model_registry, 'refresh_models', lambda: refreshed.append(True))
+    latest = max(api.games, key=lambda game: (game['date'], game['id']))
+    user = User(username='tester', password='x')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Prediction(user_id=user.id, home_team=latest['home_team']['abbreviation'],
+                              visitor_team=latest['visitor_team']['abbreviation'], lr_prob_team1_win=0.6))
+    db.session.commit()
+
+    assert sync_games(api_url=api.url, workers=4) == len(api.games)
+    assert Prediction.query.one().resolved_game_id is not None
+    assert refreshed
@@ -0,0 +1,25 @@
+from app import metrics
+
+
+def _series():
+    return {row['name']: row['count'] for row in metrics.snapshot()}
+
+
+def test_requests_are_recorded_per_endpoint(app):
+    metrics.reset()
+    client = app.test_client()
+    client.get('/login')
+    client.get('/login')
+
+    assert _series()['request.auth.login'] == 2
+
+
+def test_unmatched_requests_share_one_series(app):
+    metrics.reset()
+    client = app.test_client()
+    for url in ('/no-such-page', '/wp-login.php', '/.env'):
+        assert client.get(url).status_code == 404
+
+    series = _series()
+    assert series['request.unmatched'] == 3
+    assert 'request.None' not in series
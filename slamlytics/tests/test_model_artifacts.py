@@ -0,0 +1,72 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from ml_models import (
+    MODEL_PARAMS,
+    _prepare_dataframe,
+    current_form,
+    make_model,
+    model_input,
+    probability_matrix,
+    recency_weights,
+    train_models,
+)
+from model_artifacts import BoostedModel, compact, read_artifact, write_artifact
+
+
+@pytest.fixture
+def trained(season_app):
+    results, lr, rf, hgb = train_models(return_models=True)
+    X, _, teams, _ = _prepare_dataframe()
+    return {'lr': lr, 'rf': rf, 'hgb': hgb}, X, teams, current_form(teams)
+
+
+def test_compact_scorers_match_sklearn(trained):
+    models, X, _, _ = trained
+    scorers = compact(models)
+
+    for name, model in models.items():
+        expected = model.predict_proba(model_input(name, X))
+        np.testing.assert_allclose(scorers[name].predict_proba(X.toarray()), expected, atol=1e-9)
+        if name != 'hgb':
+            np.testing.assert_allclose(scorers[name].predict_proba(X), expected, atol=1e-9)
+
+
+def test_artifact_round_trips_through_disk(trained, tmp_path):
+    models, X, teams, form = trained
+    as_of = datetime.date(2006, 4, 1)
+    matrices = {name: probability_matrix(model, len(teams), form, as_of) for name, model in models.items()}
+    artifact = compact(dict(
+        models, fingerprint='test', results={'teams': teams}, teams=teams, form=form, matrices=matrices, as_of=as_of,
+    ))
+    write_artifact(str(tmp_path / 'models'), artifact)
+    loaded = read_artifact(str(tmp_path / 'models'))
+
+    assert (loaded['fingerprint'], loaded['teams'], loaded['as_of']) == ('test', teams, as_of)
+    np.testing.assert_array_equal(loaded['form'].values, form.values)
+    np.testing.assert_array_equal(loaded['form'].last_day, form.last_day)
+    dense = X.toarray()
+    for name, model in models.items():
+        np.testing.assert_allclose(loaded[name].predict_proba(dense), model.predict_proba(model_input(name, X)), atol=1e-9)
+        np.testing.assert_array_equal(loaded['matrices'][name], matrices[name])
+
+
+def test_hgb_engine_trains_and_round_trips(season_app, tmp_path):
+    X, y, teams, df = _prepare_dataframe()
+    model = make_model('hgb')
+    model.fit(model_input('hgb', X), y, sample_weight=recency_weights(df))
+
+    assert model.n_iter_ <= MODEL_PARAMS['hgb'][1]['max_iter']
+    expected = model.predict_proba(model_input('hgb', X))
+    assert expected.shape == (len(y), 2)
+    assert 0.5 < ((expected[:, 1] >= 0.5) == y).mean()
+
+    path = str(tmp_path / 'models')
+    write_artifact(path, compact({'hgb': model, 'fingerprint': 'hgb', 'results': {}, 'teams': teams}))
+    loaded = read_artifact(path)
+
+    assert isinstance(loaded['hgb'], BoostedModel)
+    assert loaded['lr'] is None and loaded['rf'] is None
+    np.testing.assert_allclose(loaded['hgb'].predict_proba(X), expected, atol=1e-9)
@@ -0,0 +1,38 @@
+import game_archive
+from app import db
+from game_archive import current_fingerprint, data_fingerprint, mark_games_changed
+from model_registry import build_artifact, get_models, match_probabilities
+
+
+def _count_fingerprints(monkeypatch):
+    calls = []
+
+    def counted():
+        calls.append(True)
+        return data_fingerprint()
+
+    monkeypatch.setattr(game_archive, 'data_fingerprint', counted)
+    return calls
+
+
+def test_fingerprint_is_recomputed_only_after_games_change(season_app, monkeypatch):
+    calls = _count_fingerprints(monkeypatch)
+    first = current_fingerprint()
+    assert current_fingerprint() == first
+    assert len(calls) == 1
+
+    mark_games_changed('test')
+    db.session.commit()
+    assert current_fingerprint() == first
+    assert len(calls) == 2
+
+
+def test_model_lookups_do_not_scan_the_game_table(season_app, monkeypatch):
+    artifact = build_artifact()
+    home, visitor = artifact['teams'][:2]
+    calls = _count_fingerprints(monkeypatch)
+
+    for _ in range(5):
+        assert get_models()['fingerprint'] == artifact['fingerprint']
+        assert match_probabilities(home, visitor)['lr_prob_team1_win'] is not None
+    assert calls == []
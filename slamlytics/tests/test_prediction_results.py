@@ -0,0 +1,137 @@
+import datetime
+import math
+
+import pytest
+
+from app import db
+from app.models import Game, ModelStat, Prediction, User
+from prediction_results import (
+    SCORED_MODELS, model_stats, reopen_predictions, settle_predictions, unsettle_prediction, user_leaderboard,
+)
+
+D = datetime.date
+
+
+@pytest.fixture
+def predictions(app):
+    games = {
+        'bos_1': Game(game_id='1', home_team='BOS', visitor_team='LAL', home_score=110, visitor_score=100, date=D(2020, 1, 1)),
+        'bos_2': Game(game_id='2', home_team='BOS', visitor_team='LAL', home_score=95, visitor_score=105, date=D(2020, 1, 5)),
+        'den': Game(game_id='3', home_team='DEN', visitor_team='MIA', home_score=120, visitor_score=90, date=D(2020, 1, 2)),
+        'mia': Game(game_id='4', home_team='MIA', visitor_team='DEN', home_score=100, visitor_score=101, date=D(2020, 1, 3)),
+    }
+    users = {name: User(username=name, password='x') for name in ('ann', 'bob', 'cid')}
+    db.session.add_all([*games.values(), *users.values()])
+    db.session.flush()
+
+    def predict(user, home, visitor, made, lr, rf):
+        return Prediction(user_id=users[user].id, home_team=home, visitor_team=visitor,
+                          created_at=datetime.datetime(*made), lr_prob_team1_win=lr, rf_prob_team1_win=rf)
+
+    preds = {
+        'ann_1': predict('ann', 'BOS', 'LAL', (2019, 12, 31), 0.7, 0.6),
+        'ann_2': predict('ann', 'BOS', 'LAL', (2020, 1, 3), 0.4, 0.8),
+        'bob_1': predict('bob', 'DEN', 'MIA', (2020, 1, 1), 0.3, 0.45),
+        'bob_2': predict('bob', 'MIA', 'DEN', (2020, 1, 1), 0.2, None),
+        'cid_1': predict('cid', 'BOS', 'LAL', (2020, 2, 1), 0.5, 0.5),
+    }
+    db.session.add_all(preds.values())
+    db.session.commit()
+    return games, preds
+
+
+def _totals():
+    return {stat.model: (stat.tp, stat.fp, stat.score) for stat in ModelStat.query.all()}
+
+
+def _recount():
+    """The ModelStat totals counted from scratch over the settled predictions."""
+    totals = {name: [0, 0, 0] for name in SCORED_MODELS}
+    for pred in Prediction.query.filter(Prediction.resolved_game_id.isnot(None)):
+        hits = {'lr': pred.lr_hit, 'rf': pred.rf_hit}
+        for name, hit in hits.items():
+            if hit is not None:
+                totals[name][0 if hit else 1] += 1
+        lr, rf = pred.lr_prob_team1_win, pred.rf_prob_team1_win
+        if lr is not None and rf is not None:
+            if hits['lr'] and hits['rf']:
+                winner = 'lr' if lr > rf else 'rf'
+            elif hits['lr'] or hits['rf']:
+                winner = 'lr' if hits['lr'] else 'rf'
+            else:
+                winner = 'lr' if abs(lr - 0.5) < abs(rf - 0.5) else 'rf'
+            totals[winner][2] += 1
+    return {name: tuple(values) for name, values in totals.items() if any(values)}
+
+
+def test_predictions_settle_against_the_first_game_after_them(predictions):
+    games, preds = predictions
+    assert settle_predictions() == 4
+    db.session.commit()
+
+    assert preds['ann_1'].resolved_game_id == games['bos_1'].id
+    assert preds['ann_2'].resolved_game_id == games['bos_2'].id
+    assert preds['ann_2'].actual_winner == 'LAL'
+    assert preds['bob_2'].rf_hit is None and preds['bob_2'].lr_hit
+    assert preds['cid_1'].resolved_game_id is None
+
+
+def test_settling_is_idempotent(predictions):
+    assert settle_predictions([('BOS', 'LAL')]) == 2
+    assert settle_predictions() == 2
+    db.session.commit()
+    totals = _totals()
+
+    assert settle_predictions() == 0
+    assert settle_predictions([('BOS', 'LAL'), ('DEN', 'MIA')]) == 0
+    db.session.commit()
+    assert _totals() == totals
+
+
+def test_totals_match_a_count_from_scratch(predictions):
+    settle_predictions([('DEN', 'MIA')])
+    settle_predictions()
+    db.session.commit()
+
+    assert _totals() == _recount() == {'lr': (3, 1, 2), 'rf': (1, 2, 1)}
+    metrics, scores = model_stats()
+    assert metrics['lr'] == {'TP': 3, 'FP': 1} and scores == {'lr': 2, 'rf': 1}
+
+
+def test_score_correction_reopens_and_resettles(predictions):
+    games, preds = predictions
+    settle_predictions()
+    db.session.commit()
+
+    game = games['bos_1']
+    game.home_score, game.visitor_score = 100, 110
+    assert reopen_predictions([game.id]) == 1
+    assert preds['ann_1'].resolved_game_id is None and preds['ann_1'].lr_hit is None
+    assert _totals() == {'lr': (2, 1, 1), 'rf': (0, 2, 1)}
+
+    assert settle_predictions([(game.home_team, game.visitor_team)]) == 1
+    db.session.commit()
+    assert preds['ann_1'].actual_winner == 'LAL'
+    assert _totals() == _recount() == {'lr': (2, 2, 1), 'rf': (0, 3, 2)}
+
+
+def test_deleting_a_settled_prediction_takes_it_out_of_the_totals(predictions):
+    _, preds = predictions
+    settle_predictions()
+    unsettle_prediction(preds['ann_1'])
+    db.session.delete(preds['ann_1'])
+    db.session.commit()
+    assert _totals() == _recount()
+
+
+def test_leaderboard_ranks_users_by_lr_accuracy(predictions):
+    settle_predictions()
+    db.session.commit()
+
+    board = user_leaderboard()
+    assert [row['username'] for row in board] == ['ann', 'bob']
+    ann, bob = board
+    assert (ann['total'], ann['settled'], ann['lr_accuracy']) == (2, 2, 1.0)
+    assert (bob['total'], bob['settled'], bob['lr_accuracy']) == (2, 2, 0.5)
+    assert bob['rf_accuracy'] == 0.0
+    assert ann['lr_log_loss'] == pytest.approx((-math.log(0.7) - math.log(0.6)) / 2)
@@ -0,0 +1,26 @@
+from sqlalchemy import inspect, text
+
+from app import db
+from benchmarks.query_plans import check_plans, hot_queries, query_plan
+
+
+def test_migrations_create_the_checked_indexes(migrated_app):
+    with migrated_app.app_context():
+        inspector = inspect(db.engine)
+        names = {index['name'] for table in ('game', 'prediction') for index in inspector.get_indexes(table)}
+        expected = {index for _, _, indexes in hot_queries() for index in indexes}
+    assert expected <= names
+
+
+def test_model_schema_serves_hot_queries_from_indexes(season_app):
+    assert check_plans() == []
+
+
+def test_games_page_uses_date_index(season_app):
+    statement = {name: statement for name, statement, _ in hot_queries()}['/games page']
+    assert any('INDEX ix_game_date' in line for line in query_plan(statement))
+
+
+def test_dropped_index_is_reported(season_app):
+    db.session.execute(text('DROP INDEX ix_game_date'))
+    assert '/games page: does not use ix_game_date' in check_plans()
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from simulation import EAST, WEST, elo_probability_matrix, simulate_season
+
+TEAMS = sorted(EAST | WEST)
+FIELDS = {'mean_wins', 'wins_p10', 'wins_p90', 'expected_seed', 'top6_odds', 'play_in_odds', 'top8_odds'}
+
+
+def _schedule(seed=0, rounds=4):
+    rng = np.random.default_rng(seed)
+    n = len(TEAMS)
+    home, visitor = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+    off_diagonal = home != visitor
+    home, visitor = np.tile(home[off_diagonal], rounds), np.tile(visitor[off_diagonal], rounds)
+    keep = rng.random(len(home)) < 0.1
+    return home[keep], visitor[keep]
+
+
+@pytest.fixture
+def matrix():
+    return elo_probability_matrix(np.random.default_rng(1).normal(1500, 100, len(TEAMS)))
+
+
+def test_same_seed_same_projections(matrix):
+    home, visitor = _schedule()
+    first = simulate_season(matrix, TEAMS, home, visitor, n_sims=500, batch_size=128, seed=42)
+    assert simulate_season(matrix, TEAMS, home, visitor, n_sims=500, batch_size=128, seed=42) == first
+    assert simulate_season(matrix, TEAMS, home, visitor, n_sims=500, batch_size=128, seed=43) != first
+
+
+def test_projection_shape(matrix):
+    home, visitor = _schedule()
+    projections = simulate_season(matrix, TEAMS, home, visitor, n_sims=300, seed=0)
+
+    assert list(projections) == TEAMS
+    for projection in projections.values():
+        assert set(projection) == FIELDS
+        assert projection['wins_p10'] <= projection['mean_wins'] <= projection['wins_p90']
+        assert 1 <= projection['expected_seed'] <= 15
+        for odds in ('top6_odds', 'play_in_odds', 'top8_odds'):
+            assert 0 <= projection[odds] <= 1
+        assert projection['top6_odds'] <= projection['top8_odds']
+
+    # Every simulation hands out exactly six top seeds per conference.
+    for conference in (EAST, WEST):
+        assert sum(projections[team]['top6_odds'] for team in conference) == pytest.approx(6)
+
+
+def test_win_totals_equal_games_played(matrix):
+    home, visitor = _schedule()
+    current = np.arange(len(TEAMS))
+    projections = simulate_season(matrix, TEAMS, home, visitor, current_wins=current, n_sims=700, batch_size=256, seed=3)
+
+    total = sum(projection['mean_wins'] for projection in projections.values())
+    assert total == pytest.approx(len(home) + current.sum())
+
+
+def test_certain_results_give_exact_wins():
+    n = len(TEAMS)
+    matrix = np.ones((n, n))
+    np.fill_diagonal(matrix, np.nan)
+    home, visitor = _schedule()
+
+    projections = simulate_season(matrix, TEAMS, home, visitor, n_sims=50, seed=0)
+    expected = np.bincount(home, minlength=n)
+    for i, team in enumerate(TEAMS):
+        assert projections[team]['mean_wins'] == expected[i]
+        assert projections[team]['wins_p10'] == projections[team]['wins_p90'] == expected[i]
+
+
+def test_missing_matchup_probability_is_rejected(matrix):
+    with pytest.raises(ValueError):
+        simulate_season(matrix, TEAMS, [0, 1], [0, 2], n_sims=10)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from ml_models import MAX_RECENCY_WEIGHT, WEIGHTING_STRATEGIES, _prepare_dataframe, recency_weights
+
+
+@pytest.fixture
+def frame(season_app):
+    X, y, teams, df = _prepare_dataframe()
+    return df[['date', 'team1_id', 'team2_id']].reset_index(drop=True)
+
+
+@pytest.mark.parametrize('weighting', sorted(WEIGHTING_STRATEGIES))
+def test_weights_do_not_depend_on_row_order(frame, weighting):
+    weights = recency_weights(frame, weighting)
+    assert weights.shape == (len(frame),)
+
+    order = np.random.default_rng(0).permutation(len(frame))
+    shuffled = recency_weights(frame.iloc[order], weighting)
+    np.testing.assert_allclose(shuffled, weights[order])
+
+    # Swapping home and visitor doesn't change a game's weight either.
+    swapped = frame.rename(columns={'team1_id': 'team2_id', 'team2_id': 'team1_id'})
+    np.testing.assert_allclose(recency_weights(swapped, weighting), weights)
+
+
+@pytest.mark.parametrize('weighting', sorted(WEIGHTING_STRATEGIES))
+def test_weights_favour_recent_games(frame, weighting):
+    weights = recency_weights(frame, weighting)
+    assert np.all(weights > 0)
+    assert weights[-100:].mean() >= weights[:100].mean()
+
+
+def test_team_rank_weights_span_one_to_max(frame):
+    weights = recency_weights(frame, 'team_rank')
+    assert weights.min() >= 1
+    assert weights.max() <= MAX_RECENCY_WEIGHT
+    assert weights[-1] > weights[0]
+
+
+def test_empty_frame_has_no_weights(frame):
+    for weighting in WEIGHTING_STRATEGIES:
+        assert recency_weights(frame.iloc[:0], weighting).shape == (0,)
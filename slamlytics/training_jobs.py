@@ -0,0 +1,53 @@
+from flask import current_app
+
+from background_jobs import JobRunner
+
+MAX_TRACKED_JOBS = 10
+
+_runner = JobRunner('model-training', fingerprint=None)
+_jobs = {}
+
+
+def _train(on_done):
+    from model_registry import build_artifact
+
+    artifact = build_artifact()
+    if on_done is not None:
+        on_done(artifact)
+    return artifact['fingerprint']
+
+
+def submit_training(fingerprint, on_done=None):
+    """
+    Queues a training run for the given data fingerprint on the background
+    worker and returns its Future. Requests for a fingerprint that is
+    already queued, running or finished share the same job; a job that
+    raised is dropped, so the next request retries it.
+    """
+    app = current_app._get_current_object()
+
+    with _runner.lock:
+        future = _jobs.get(fingerprint)
+        if future is not None and not (future.done() and future.exception() is not None):
+            return future
+
+        future = _runner.submit(app, lambda: _train(on_done), fingerprint=fingerprint)
+        _jobs[fingerprint] = future
+
+        for old_fingerprint in list(_jobs)[:-MAX_TRACKED_JOBS]:
+            if _jobs[old_fingerprint].done():
+                del _jobs[old_fingerprint]
+
+        return future
+
+
+def is_training(fingerprint=None):
+    with _runner.lock:
+        if fingerprint is None:
+            return any(not future.done() for future in _jobs.values())
+        future = _jobs.get(fingerprint)
+        return future is not None and not future.done()
+
+
+def job_status():
+    return _runner.status()
@@ -0,0 +1,40 @@
+"""
+WSGI entry point for production servers:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py creates the app once in the master process and calls
+warm_up() there before forking, so every worker starts with the ML
+modules imported and the current models loaded, sharing those pages
+copy-on-write instead of loading its own copy.
+"""
+import gc
+
+from app import create_app, db
+
+app = create_app()
+
+
+def warm_up(app):
+    """
+    Imports the ML stack, loads the current model artifact and scores one
+    matchup with it so its arrays are paged in. Then closes the database
+    connections this opened, so no connection is shared with the forked
+    workers, and freezes the objects created so far out of the garbage
+    collector, whose passes would otherwise copy their pages in every
+    worker. Returns the artifact, or None if no model is trained yet.
+    """
+    from ml_models import predict_matches
+    from model_registry import preload_models
+
+    with app.app_context():
+        models = preload_models()
+        if models is not None and models['lr'] is not None and len(models['teams']) > 1:
+            predict_matches(
+                [tuple(models['teams'][:2])], models['lr'], models['rf'],
+                teams=models['teams'], form=models['form'], hgb_model=models['hgb'],
+            )
+        db.engine.dispose()
+
+    gc.freeze()
+    return models